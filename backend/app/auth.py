@@ -7,27 +7,200 @@ import json
 import os
 import secrets
 import sqlite3
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Any
-from uuid import uuid4
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import IntFlag
+from typing import Any, Callable
 
 import jwt
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jwt import PyJWTError
 
-
-@dataclass(frozen=True)
+from triage_agent.database import SQLITE_JOURNAL_MODES
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+_ACCESS_TOKEN_CACHE_TTL_SECONDS = 30
+_ACCESS_TOKEN_CACHE_MAX_ENTRIES = 10_000
+_LOGIN_FAILURE_FLUSH_AFTER_SECONDS = 10
+_LOGIN_FAILURE_FLUSH_INTERVAL_SECONDS = 30
+_LOGIN_FAILURE_PRUNE_INTERVAL_SECONDS = 60
+_AUTH_SCHEMA_VERSION = 2
+_AUTH_USERS_MIGRATED_COLUMNS = {
+    "onboarding_completed": "INTEGER NOT NULL DEFAULT 0",
+}
+_SALT_BYTES = 16
+_PBKDF2_SHA512_ITERATIONS = 210_000
+_SCRYPT_N = 2**14
+_SCRYPT_R = 8
+_SCRYPT_P = 5
+_SCRYPT_MAXMEM = 128 * _SCRYPT_R * (_SCRYPT_N + _SCRYPT_P + 2)
+_SCRYPT_AVAILABLE = hasattr(hashlib, "scrypt")
+_PBKDF2_SCHEMES = {"pbkdf2_sha256": "sha256", "pbkdf2_sha512": "sha512"}
+_ACCESS_TOKEN_CLAIMS = ["exp", "sub", "typ", "role"]
+_REFRESH_TOKEN_CLAIMS = ["exp", "sub", "typ", "jti", "fid"]
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+_INVALID_TOKEN_ERROR = (status.HTTP_401_UNAUTHORIZED, "Invalid or expired token.")
+_MISSING_TOKEN_ERROR = (status.HTTP_401_UNAUTHORIZED, "Missing bearer token.")
+_PWD_CHANGE_ERROR = (
+    status.HTTP_403_FORBIDDEN,
+    "Password change is required before accessing this resource.",
+)
+_ONBOARDING_ERROR = (
+    status.HTTP_403_FORBIDDEN,
+    "Onboarding is required before accessing this resource.",
+)
+_ROLE_ERROR = (status.HTTP_403_FORBIDDEN, "Insufficient role privileges.")
+_TOKEN_SUBJECT_ERROR = (status.HTTP_401_UNAUTHORIZED, "Invalid token subject.")
+_TOKEN_TYPE_ERROR = (status.HTTP_401_UNAUTHORIZED, "Invalid token type.")
+_REFRESH_PAYLOAD_ERROR = (status.HTTP_401_UNAUTHORIZED, "Malformed refresh token payload.")
+_REFRESH_UNKNOWN_ERROR = (status.HTTP_401_UNAUTHORIZED, "Refresh token is not recognized.")
+_REFRESH_REUSE_ERROR = (status.HTTP_401_UNAUTHORIZED, "Refresh token reuse detected.")
+_REFRESH_EXPIRED_ERROR = (status.HTTP_401_UNAUTHORIZED, "Refresh token expired.")
+_SESSION_USER_ERROR = (status.HTTP_401_UNAUTHORIZED, "User not found.")
+_CURRENT_PASSWORD_ERROR = (status.HTTP_400_BAD_REQUEST, "Current password is invalid.")
+_PASSWORD_REUSE_ERROR = (
+    status.HTTP_400_BAD_REQUEST,
+    "New password must be different from current password.",
+)
+_NEW_PASSWORD_LENGTH_ERROR = (
+    status.HTTP_400_BAD_REQUEST,
+    "New password must be at least 8 characters.",
+)
+_USER_NOT_FOUND_ERROR = (status.HTTP_404_NOT_FOUND, "User not found.")
+_INVALID_ROLE_ERROR = (
+    status.HTTP_400_BAD_REQUEST,
+    "Invalid role. Must be admin, nurse, or operations.",
+)
+_PASSWORD_LENGTH_ERROR = (status.HTTP_400_BAD_REQUEST, "Password must be at least 8 characters.")
+_USERNAME_TAKEN_ERROR = (status.HTTP_409_CONFLICT, "Username already exists.")
+_DEFAULT_USER_DELETE_ERROR = (status.HTTP_400_BAD_REQUEST, "Cannot delete default system users.")
+_AUTH_UNAVAILABLE_ERROR = (status.HTTP_503_SERVICE_UNAVAILABLE, "Auth manager unavailable.")
+_SQL_GET_USER = """
+SELECT
+    username,
+    role,
+    full_name,
+    password_change_required,
+    onboarding_completed,
+    password_hash
+FROM auth_users
+WHERE username = ?;
+"""
+_SQL_LIST_USERS = """
+SELECT username, role, full_name, password_change_required, onboarding_completed
+FROM auth_users
+ORDER BY role, username;
+"""
+_SQL_INSERT_REFRESH_SESSION = """
+INSERT INTO auth_refresh_sessions (
+    jti,
+    username,
+    family_id,
+    expires_at_epoch,
+    revoked,
+    replaced_by_jti
+)
+VALUES (?, ?, ?, ?, 0, NULL);
+"""
+_SQL_GET_REFRESH_SESSION = """
+SELECT
+    jti,
+    username,
+    family_id,
+    expires_at_epoch,
+    revoked
+FROM auth_refresh_sessions
+WHERE jti = ?;
+"""
+_SQL_REVOKE_REFRESH_SESSION = """
+UPDATE auth_refresh_sessions
+SET revoked = 1, revoked_at = ?
+WHERE jti = ?;
+"""
+_SQL_REVOKE_REFRESH_FAMILY = """
+UPDATE auth_refresh_sessions
+SET revoked = 1, revoked_at = ?
+WHERE family_id = ? AND revoked = 0;
+"""
+_SQL_REVOKE_USER_SESSIONS = """
+UPDATE auth_refresh_sessions
+SET revoked = 1, revoked_at = ?
+WHERE username = ? AND revoked = 0;
+"""
+_SQL_UPSERT_LOGIN_FAILURES = """
+INSERT INTO auth_login_failure_counters (
+    username,
+    source_ip,
+    window_start_epoch,
+    count,
+    last_failure_epoch
+)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(username, source_ip) DO UPDATE SET
+    count = CASE
+        WHEN excluded.last_failure_epoch - window_start_epoch > ? THEN excluded.count
+        ELSE count + excluded.count
+    END,
+    window_start_epoch = CASE
+        WHEN excluded.last_failure_epoch - window_start_epoch > ?
+            THEN excluded.window_start_epoch
+        ELSE window_start_epoch
+    END,
+    last_failure_epoch = excluded.last_failure_epoch;
+"""
+_SQL_GET_LOGIN_FAILURE_STATS = """
+SELECT count, last_failure_epoch
+FROM auth_login_failure_counters
+WHERE username = ?
+  AND source_ip = ?
+  AND last_failure_epoch >= ?;
+"""
+_SQL_DELETE_LOGIN_FAILURES = """
+DELETE FROM auth_login_failure_counters
+WHERE username = ? AND source_ip = ?;
+"""
+_SQL_PRUNE_LOGIN_FAILURES = """
+DELETE FROM auth_login_failure_counters
+WHERE last_failure_epoch < ?;
+"""
+
+
+def _auth_error(error: tuple[int, str]) -> HTTPException:
+    status_code, detail = error
+    return HTTPException(status_code=status_code, detail=detail)
+
+
+class RoleFlag(IntFlag):
+    ADMIN = 1
+    NURSE = 2
+    OPERATIONS = 4
+
+
+@dataclass(frozen=True, slots=True)
 class AuthUser:
     username: str
     role: str
     full_name: str | None = None
     password_change_required: bool = False
     onboarding_completed: bool = False
+    role_flag: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "role_flag", _role_mask((self.role,)))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class _SeedUser:
     username: str
     password: str
@@ -50,15 +223,40 @@ class AuthManager:
         login_window_seconds: int,
         login_lockout_seconds: int,
         seed_users: list[_SeedUser],
+        journal_mode: str = "WAL",
+        clock: Callable[[], float] = time.time,
     ) -> None:
         self.db_path = db_path
+        journal_mode = journal_mode.upper()
+        self.journal_mode = journal_mode if journal_mode in SQLITE_JOURNAL_MODES else "WAL"
+        self.clock = clock
         self.secret_key = secret_key
         self.algorithm = algorithm
+        self._signing_key, self._verifying_key = _prepare_jwt_keys(secret_key, algorithm)
+        self._hmac_digest = _HMAC_DIGESTS.get(algorithm)
+        self._jwt_header_b64 = _b64url_encode(
+            json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode("utf-8")
+        )
         self.access_token_exp_minutes = access_token_exp_minutes
         self.refresh_token_exp_minutes = refresh_token_exp_minutes
         self.login_max_attempts = max(1, login_max_attempts)
         self.login_window_seconds = max(1, login_window_seconds)
         self.login_lockout_seconds = max(1, login_lockout_seconds)
+        self._access_ttl_seconds = access_token_exp_minutes * 60
+        self._refresh_ttl_seconds = refresh_token_exp_minutes * 60
+        self._token_cache: dict[bytes, tuple[AuthUser, float, float]] = {}
+        self._token_cache_key = secrets.token_bytes(32)
+        self._token_cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._failure_buffer: dict[tuple[str, str], list[int]] = {}
+        self._failure_buffer_lock = threading.Lock()
+        self._failure_flush_timer: threading.Timer | None = None
+        self._failure_flush_threshold = max(1, self.login_max_attempts // 2)
+        self._last_prune_epoch = 0
+        self._prune_lock = threading.Lock()
+        self._dummy_password_hash = hash_password(secrets.token_urlsafe(16))
         self._init_storage(seed_users)
 
     @classmethod
@@ -79,6 +277,7 @@ class AuthManager:
         login_lockout_seconds = _env_int("TRIAGE_AUTH_LOGIN_LOCKOUT_SECONDS", 900, min_value=1)
         force_change_defaults = _env_bool("TRIAGE_AUTH_FORCE_CHANGE_DEFAULTS", True)
         seed_users = _load_seed_users(force_change_defaults=force_change_defaults)
+        journal_mode = os.getenv("TRIAGE_SQLITE_JOURNAL_MODE", "").strip() or "WAL"
         return cls(
             db_path=db_path,
             secret_key=secret_key,
@@ -89,14 +288,19 @@ class AuthManager:
             login_window_seconds=login_window_seconds,
             login_lockout_seconds=login_lockout_seconds,
             seed_users=seed_users,
+            journal_mode=journal_mode,
         )
 
     def authenticate(self, username: str, password: str) -> AuthUser | None:
         row = self._get_user_row(username)
         if not row:
+            verify_password(password, self._dummy_password_hash)
             return None
-        if not verify_password(password, row["password_hash"]):
+        password_hash = row["password_hash"]
+        if not verify_password(password, password_hash):
             return None
+        if password_needs_rehash(password_hash):
+            self._rehash_password(username, password, password_hash)
         return self._row_to_user(row)
 
     def check_login_allowed(self, username: str, source_ip: str | None) -> tuple[bool, int]:
@@ -105,13 +309,19 @@ class AuthManager:
         now_epoch = self._now_epoch()
         window_start = now_epoch - self.login_window_seconds
         with self._connect() as conn:
-            self._prune_login_failures(conn, now_epoch)
+            self._maybe_prune_login_failures(conn, now_epoch)
             failure_count, last_failure_epoch = self._get_recent_failure_stats(
                 conn=conn,
                 username_key=username_key,
                 source_ip_key=source_ip_key,
                 window_start=window_start,
             )
+        failure_count, last_failure_epoch = self._merge_buffered_failures(
+            key=(username_key, source_ip_key),
+            window_start=window_start,
+            failure_count=failure_count,
+            last_failure_epoch=last_failure_epoch,
+        )
         if failure_count < self.login_max_attempts:
             return True, 0
         lockout_remaining = (last_failure_epoch + self.login_lockout_seconds) - now_epoch
@@ -122,27 +332,40 @@ class AuthManager:
     def record_failed_login(self, username: str, source_ip: str | None) -> tuple[bool, int]:
         username_key = self._login_key_username(username)
         source_ip_key = self._login_key_source_ip(source_ip)
+        key = (username_key, source_ip_key)
         now_epoch = self._now_epoch()
         window_start = now_epoch - self.login_window_seconds
+        with self._failure_buffer_lock:
+            attempts = self._failure_buffer.setdefault(key, [])
+            attempts.append(now_epoch)
+            if (
+                len(attempts) >= self._failure_flush_threshold
+                or now_epoch - attempts[0] > _LOGIN_FAILURE_FLUSH_AFTER_SECONDS
+            ):
+                pending = self._failure_buffer.pop(key)
+            else:
+                pending = []
+                self._schedule_failure_flush()
         with self._connect() as conn:
-            self._prune_login_failures(conn, now_epoch)
-            conn.execute(
-                """
-                INSERT INTO auth_login_failures (
-                    username,
-                    source_ip,
-                    attempted_at_epoch
+            conn.execute("BEGIN IMMEDIATE;")
+            self._maybe_prune_login_failures(conn, now_epoch)
+            if pending:
+                self._upsert_login_failures(
+                    conn,
+                    [(username_key, source_ip_key, pending[0], len(pending), pending[-1])],
                 )
-                VALUES (?, ?, ?);
-                """,
-                (username_key, source_ip_key, now_epoch),
-            )
             failure_count, last_failure_epoch = self._get_recent_failure_stats(
                 conn=conn,
                 username_key=username_key,
                 source_ip_key=source_ip_key,
                 window_start=window_start,
             )
+        failure_count, last_failure_epoch = self._merge_buffered_failures(
+            key=key,
+            window_start=window_start,
+            failure_count=failure_count,
+            last_failure_epoch=last_failure_epoch,
+        )
         if failure_count < self.login_max_attempts:
             return False, 0
         lockout_remaining = (last_failure_epoch + self.login_lockout_seconds) - now_epoch
@@ -153,26 +376,52 @@ class AuthManager:
     def record_successful_login(self, username: str, source_ip: str | None) -> None:
         username_key = self._login_key_username(username)
         source_ip_key = self._login_key_source_ip(source_ip)
+        with self._failure_buffer_lock:
+            self._failure_buffer.pop((username_key, source_ip_key), None)
         with self._connect() as conn:
             conn.execute(
-                """
-                DELETE FROM auth_login_failures
-                WHERE username = ? AND source_ip = ?;
-                """,
+                _SQL_DELETE_LOGIN_FAILURES,
                 (username_key, source_ip_key),
             )
 
+    def flush_login_failures(self) -> None:
+        rows = self._take_buffered_failures()
+        if not rows:
+            return
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE;")
+            self._upsert_login_failures(conn, rows)
+
+    def _flush_login_failures_on_timer(self) -> None:
+        rows = self._take_buffered_failures()
+        if not rows:
+            return
+        conn = self._open_connection()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE;")
+                self._upsert_login_failures(conn, rows)
+        finally:
+            conn.close()
+
+    def _take_buffered_failures(self) -> list[tuple[str, str, int, int, int]]:
+        with self._failure_buffer_lock:
+            pending, self._failure_buffer = self._failure_buffer, {}
+            self._failure_flush_timer = None
+        return [
+            (username_key, source_ip_key, attempts[0], len(attempts), attempts[-1])
+            for (username_key, source_ip_key), attempts in pending.items()
+            if attempts
+        ]
+
     def get_user(self, username: str) -> AuthUser:
         row = self._get_user_row(username)
         if not row:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token subject.",
-            )
+            raise _auth_error(_TOKEN_SUBJECT_ERROR)
         return self._row_to_user(row)
 
     def issue_access_token(self, user: AuthUser) -> str:
-        now = datetime.now(timezone.utc)
+        now_epoch = int(time.time())
         payload = {
             "typ": "access",
             "sub": user.username,
@@ -180,10 +429,10 @@ class AuthManager:
             "full_name": user.full_name,
             "pwd_reset_required": bool(user.password_change_required),
             "onboarding_completed": bool(user.onboarding_completed),
-            "iat": int(now.timestamp()),
-            "exp": int((now + timedelta(minutes=self.access_token_exp_minutes)).timestamp()),
+            "iat": now_epoch,
+            "exp": now_epoch + self._access_ttl_seconds,
         }
-        return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+        return self._encode_token(payload)
 
     def issue_refresh_token(
         self,
@@ -191,11 +440,11 @@ class AuthManager:
         family_id: str | None = None,
         *,
         conn: sqlite3.Connection | None = None,
-    ) -> str:
-        now = datetime.now(timezone.utc)
-        jti = str(uuid4())
-        family = family_id or str(uuid4())
-        exp = int((now + timedelta(minutes=self.refresh_token_exp_minutes)).timestamp())
+    ) -> tuple[str, str]:
+        now_epoch = int(time.time())
+        jti = secrets.token_hex(16)
+        family = family_id or secrets.token_hex(16)
+        exp = now_epoch + self._refresh_ttl_seconds
         payload = {
             "typ": "refresh",
             "sub": user.username,
@@ -205,164 +454,114 @@ class AuthManager:
             "onboarding_completed": bool(user.onboarding_completed),
             "jti": jti,
             "fid": family,
-            "iat": int(now.timestamp()),
+            "iat": now_epoch,
             "exp": exp,
         }
-        token = jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+        token = self._encode_token(payload)
         if conn is not None:
             conn.execute(
-                """
-                INSERT INTO auth_refresh_sessions (
-                    jti,
-                    username,
-                    family_id,
-                    expires_at_epoch,
-                    revoked,
-                    replaced_by_jti
-                )
-                VALUES (?, ?, ?, ?, 0, NULL);
-                """,
+                _SQL_INSERT_REFRESH_SESSION,
                 (jti, user.username, family, exp),
             )
         else:
             with self._connect() as local_conn:
                 local_conn.execute(
-                    """
-                    INSERT INTO auth_refresh_sessions (
-                        jti,
-                        username,
-                        family_id,
-                        expires_at_epoch,
-                        revoked,
-                        replaced_by_jti
-                    )
-                    VALUES (?, ?, ?, ?, 0, NULL);
-                    """,
+                    _SQL_INSERT_REFRESH_SESSION,
                     (jti, user.username, family, exp),
                 )
-        return token
+        return token, jti
 
     def issue_token_pair(self, user: AuthUser, *, family_id: str | None = None) -> dict[str, Any]:
+        refresh_token, _ = self.issue_refresh_token(user, family_id=family_id)
         return {
             "access_token": self.issue_access_token(user),
-            "refresh_token": self.issue_refresh_token(user, family_id=family_id),
+            "refresh_token": refresh_token,
             "token_type": "bearer",
-            "expires_in": self.access_token_exp_minutes * 60,
-            "refresh_expires_in": self.refresh_token_exp_minutes * 60,
+            "expires_in": self._access_ttl_seconds,
+            "refresh_expires_in": self._refresh_ttl_seconds,
             "user": user,
         }
 
     def parse_access_token(self, token: str) -> AuthUser:
-        payload = self._decode_token(token)
-        if payload.get("typ") != "access":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type.",
-            )
-        username = payload.get("sub")
-        if not isinstance(username, str):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Malformed token payload.",
-            )
-        return self.get_user(username)
+        cache_key = hashlib.blake2b(
+            token.encode("utf-8"),
+            key=self._token_cache_key,
+            digest_size=16,
+        ).digest()
+        now = time.time()
+        with self._token_cache_lock:
+            cached = self._token_cache.get(cache_key)
+            if cached is not None and cached[2] <= now:
+                del self._token_cache[cache_key]
+                cached = None
+        if cached is not None:
+            user, user_expires_at, token_exp = cached
+            if user_expires_at > now:
+                return user
+            user = self.get_user(user.username)
+            self._cache_access_token(cache_key, user, token_exp, now=now)
+            return user
+
+        payload = self._decode_token(token, required=_ACCESS_TOKEN_CLAIMS)
+        if payload["typ"] != "access":
+            raise _auth_error(_TOKEN_TYPE_ERROR)
+        user = self.get_user(payload["sub"])
+        self._cache_access_token(cache_key, user, float(payload["exp"]), now=now)
+        return user
 
     def rotate_refresh_token(self, refresh_token: str) -> dict[str, Any]:
-        payload = self._decode_token(refresh_token)
-        if payload.get("typ") != "refresh":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type.",
-            )
+        payload = self._decode_token(refresh_token, required=_REFRESH_TOKEN_CLAIMS)
+        if payload["typ"] != "refresh":
+            raise _auth_error(_TOKEN_TYPE_ERROR)
 
-        jti = payload.get("jti")
-        family_id = payload.get("fid")
-        username = payload.get("sub")
-        if not isinstance(jti, str) or not isinstance(family_id, str) or not isinstance(username, str):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Malformed refresh token payload.",
-            )
+        jti = payload["jti"]
+        family_id = payload["fid"]
+        username = payload["sub"]
+        if not isinstance(family_id, str):
+            raise _auth_error(_REFRESH_PAYLOAD_ERROR)
 
-        now_epoch = int(datetime.now(timezone.utc).timestamp())
+        now_epoch = self._now_epoch()
+        now_text = _db_timestamp(now_epoch)
         with self._connect() as conn:
             conn.execute("BEGIN IMMEDIATE;")
             row = conn.execute(
-                """
-                SELECT
-                    jti,
-                    username,
-                    family_id,
-                    expires_at_epoch,
-                    revoked
-                FROM auth_refresh_sessions
-                WHERE jti = ?;
-                """,
+                _SQL_GET_REFRESH_SESSION,
                 (jti,),
             ).fetchone()
             if not row:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Refresh token is not recognized.",
-                )
+                raise _auth_error(_REFRESH_UNKNOWN_ERROR)
 
             if int(row["revoked"]) == 1:
                 conn.execute(
-                    """
-                    UPDATE auth_refresh_sessions
-                    SET revoked = 1, revoked_at = datetime('now')
-                    WHERE family_id = ?;
-                    """,
-                    (row["family_id"],),
+                    _SQL_REVOKE_REFRESH_FAMILY,
+                    (now_text, row["family_id"]),
                 )
                 conn.commit()
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Refresh token reuse detected.",
-                )
+                raise _auth_error(_REFRESH_REUSE_ERROR)
 
             if int(row["expires_at_epoch"]) < now_epoch:
                 conn.execute(
-                    """
-                    UPDATE auth_refresh_sessions
-                    SET revoked = 1, revoked_at = datetime('now')
-                    WHERE jti = ?;
-                    """,
-                    (jti,),
+                    _SQL_REVOKE_REFRESH_SESSION,
+                    (now_text, jti),
                 )
                 conn.commit()
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Refresh token expired.",
-                )
+                raise _auth_error(_REFRESH_EXPIRED_ERROR)
 
-            user_row = conn.execute(
-                """
-                SELECT username, role, full_name, password_change_required, onboarding_completed
-                FROM auth_users
-                WHERE username = ?;
-                """,
-                (username,),
-            ).fetchone()
+            user_row = conn.execute(_SQL_GET_USER, (username,)).fetchone()
             if not user_row:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token subject.",
-                )
+                raise _auth_error(_TOKEN_SUBJECT_ERROR)
             user = self._row_to_user(user_row)
 
             conn.execute(
                 """
                 UPDATE auth_refresh_sessions
-                SET revoked = 1, used_at = datetime('now'), revoked_at = datetime('now')
+                SET revoked = 1, used_at = ?, revoked_at = ?
                 WHERE jti = ?;
                 """,
-                (jti,),
+                (now_text, now_text, jti),
             )
 
-            new_refresh = self.issue_refresh_token(user, family_id=family_id, conn=conn)
-            new_payload = self._decode_token(new_refresh)
-            new_jti = str(new_payload["jti"])
+            new_refresh, new_jti = self.issue_refresh_token(user, family_id=family_id, conn=conn)
 
             conn.execute(
                 """
@@ -377,39 +576,32 @@ class AuthManager:
             "access_token": self.issue_access_token(user),
             "refresh_token": new_refresh,
             "token_type": "bearer",
-            "expires_in": self.access_token_exp_minutes * 60,
-            "refresh_expires_in": self.refresh_token_exp_minutes * 60,
+            "expires_in": self._access_ttl_seconds,
+            "refresh_expires_in": self._refresh_ttl_seconds,
             "user": user,
         }
 
     def revoke_refresh_token(self, refresh_token: str) -> None:
         try:
-            payload = self._decode_token(refresh_token, verify_exp=False)
+            payload = self._decode_token(refresh_token, verify_exp=False, required=["jti"])
         except HTTPException:
             return
-        jti = payload.get("jti")
-        if not isinstance(jti, str):
-            return
+        jti = payload["jti"]
+        now_text = _db_timestamp()
         with self._connect() as conn:
             conn.execute(
-                """
-                UPDATE auth_refresh_sessions
-                SET revoked = 1, revoked_at = datetime('now')
-                WHERE jti = ?;
-                """,
-                (jti,),
+                _SQL_REVOKE_REFRESH_SESSION,
+                (now_text, jti),
             )
 
     def revoke_user_sessions(self, username: str) -> None:
+        now_text = _db_timestamp()
         with self._connect() as conn:
             conn.execute(
-                """
-                UPDATE auth_refresh_sessions
-                SET revoked = 1, revoked_at = datetime('now')
-                WHERE username = ?;
-                """,
-                (username,),
+                _SQL_REVOKE_USER_SESSIONS,
+                (now_text, username),
             )
+        self._invalidate_cached_user(username)
 
     def change_password(
         self,
@@ -420,93 +612,73 @@ class AuthManager:
     ) -> AuthUser:
         row = self._get_user_row(username)
         if not row:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found.",
-            )
+            raise _auth_error(_SESSION_USER_ERROR)
         if not verify_password(current_password, row["password_hash"]):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Current password is invalid.",
-            )
+            raise _auth_error(_CURRENT_PASSWORD_ERROR)
         if current_password == new_password:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="New password must be different from current password.",
-            )
+            raise _auth_error(_PASSWORD_REUSE_ERROR)
         if len(new_password) < 8:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="New password must be at least 8 characters.",
-            )
+            raise _auth_error(_NEW_PASSWORD_LENGTH_ERROR)
 
         new_hash = hash_password(new_password)
+        now_text = _db_timestamp()
         with self._connect() as conn:
-            conn.execute(
+            conn.execute("BEGIN IMMEDIATE;")
+            updated = conn.execute(
                 """
                 UPDATE auth_users
-                SET password_hash = ?, password_change_required = 0, updated_at = datetime('now')
-                WHERE username = ?;
+                SET password_hash = ?, password_change_required = 0, updated_at = ?
+                WHERE username = ?
+                RETURNING username, role, full_name, password_change_required, onboarding_completed;
                 """,
-                (new_hash, username),
-            )
+                (new_hash, now_text, username),
+            ).fetchone()
+            if not updated:
+                raise _auth_error(_SESSION_USER_ERROR)
             conn.execute(
-                """
-                UPDATE auth_refresh_sessions
-                SET revoked = 1, revoked_at = datetime('now')
-                WHERE username = ?;
-                """,
-                (username,),
+                _SQL_REVOKE_USER_SESSIONS,
+                (now_text, username),
             )
-        return self.get_user(username)
+        self._invalidate_cached_user(username)
+        return self._row_to_user(updated)
 
     def complete_onboarding(self, *, username: str) -> AuthUser:
+        now_text = _db_timestamp()
         with self._connect() as conn:
-            conn.execute(
+            row = conn.execute(
                 """
                 UPDATE auth_users
-                SET onboarding_completed = 1, updated_at = datetime('now')
-                WHERE username = ?;
+                SET onboarding_completed = 1, updated_at = ?
+                WHERE username = ?
+                RETURNING username, role, full_name, password_change_required, onboarding_completed;
                 """,
-                (username,),
-            )
-        return self.get_user(username)
+                (now_text, username),
+            ).fetchone()
+        if not row:
+            raise _auth_error(_TOKEN_SUBJECT_ERROR)
+        self._invalidate_cached_user(username)
+        return self._row_to_user(row)
 
     def reset_onboarding(self, *, username: str) -> AuthUser:
+        now_text = _db_timestamp()
         with self._connect() as conn:
             row = conn.execute(
-                """
-                SELECT username
-                FROM auth_users
-                WHERE username = ?;
-                """,
-                (username,),
-            ).fetchone()
-            if not row:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found.",
-                )
-            conn.execute(
                 """
                 UPDATE auth_users
-                SET onboarding_completed = 0, updated_at = datetime('now')
-                WHERE username = ?;
+                SET onboarding_completed = 0, updated_at = ?
+                WHERE username = ?
+                RETURNING username, role, full_name, password_change_required, onboarding_completed;
                 """,
-                (username,),
-            )
-        return self.get_user(username)
+                (now_text, username),
+            ).fetchone()
+        if not row:
+            raise _auth_error(_USER_NOT_FOUND_ERROR)
+        self._invalidate_cached_user(username)
+        return self._row_to_user(row)
 
     def list_users(self) -> list[AuthUser]:
         with self._connect() as conn:
-            rows = conn.execute(
-                """
-                SELECT username, role, full_name, password_change_required, onboarding_completed
-                FROM auth_users
-                ORDER BY role, username;
-                """
-            ).fetchall()
-        return [self._row_to_user(row) for row in rows]
+            return [self._row_to_user(row) for row in conn.execute(_SQL_LIST_USERS)]
 
     def create_user(
         self,
@@ -517,19 +689,13 @@ class AuthManager:
         full_name: str | None = None,
     ) -> AuthUser:
         if role.lower() not in {"admin", "nurse", "operations"}:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid role. Must be admin, nurse, or operations.",
-            )
+            raise _auth_error(_INVALID_ROLE_ERROR)
         if len(password) < 8:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Password must be at least 8 characters.",
-            )
+            raise _auth_error(_PASSWORD_LENGTH_ERROR)
         password_hash = hash_password(password)
         with self._connect() as conn:
             try:
-                conn.execute(
+                row = conn.execute(
                     """
                     INSERT INTO auth_users (
                         username,
@@ -540,16 +706,14 @@ class AuthManager:
                         onboarding_completed,
                         is_default
                     )
-                    VALUES (?, ?, ?, ?, 1, 0, 0);
+                    VALUES (?, ?, ?, ?, 1, 0, 0)
+                    RETURNING username, role, full_name, password_change_required, onboarding_completed;
                     """,
                     (username, password_hash, role.lower(), full_name),
-                )
+                ).fetchone()
             except sqlite3.IntegrityError as exc:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="Username already exists.",
-                ) from exc
-        return self.get_user(username)
+                raise _auth_error(_USERNAME_TAKEN_ERROR) from exc
+        return self._row_to_user(row)
 
     def update_user(
         self,
@@ -559,43 +723,31 @@ class AuthManager:
         full_name: str | None = None,
     ) -> AuthUser:
         if role and role.lower() not in {"admin", "nurse", "operations"}:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid role. Must be admin, nurse, or operations.",
-            )
+            raise _auth_error(_INVALID_ROLE_ERROR)
+        now_text = _db_timestamp()
         with self._connect() as conn:
             row = conn.execute(
                 """
-                SELECT username
-                FROM auth_users
-                WHERE username = ?;
+                UPDATE auth_users
+                SET
+                    role = COALESCE(?, role),
+                    full_name = CASE WHEN ? THEN ? ELSE full_name END,
+                    updated_at = ?
+                WHERE username = ?
+                RETURNING username, role, full_name, password_change_required, onboarding_completed;
                 """,
-                (username,),
+                (
+                    role.lower() if role else None,
+                    full_name is not None,
+                    full_name,
+                    now_text,
+                    username,
+                ),
             ).fetchone()
-            if not row:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found.",
-                )
-            if role:
-                conn.execute(
-                    """
-                    UPDATE auth_users
-                    SET role = ?, updated_at = datetime('now')
-                    WHERE username = ?;
-                    """,
-                    (role.lower(), username),
-                )
-            if full_name is not None:
-                conn.execute(
-                    """
-                    UPDATE auth_users
-                    SET full_name = ?, updated_at = datetime('now')
-                    WHERE username = ?;
-                    """,
-                    (full_name, username),
-                )
-        return self.get_user(username)
+        if not row:
+            raise _auth_error(_USER_NOT_FOUND_ERROR)
+        self._invalidate_cached_user(username)
+        return self._row_to_user(row)
 
     def admin_reset_password(
         self,
@@ -604,45 +756,32 @@ class AuthManager:
         new_password: str,
     ) -> AuthUser:
         if len(new_password) < 8:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Password must be at least 8 characters.",
-            )
+            raise _auth_error(_PASSWORD_LENGTH_ERROR)
         new_hash = hash_password(new_password)
+        now_text = _db_timestamp()
         with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE;")
             row = conn.execute(
                 """
-                SELECT username
-                FROM auth_users
-                WHERE username = ?;
+                UPDATE auth_users
+                SET password_hash = ?, password_change_required = 1, updated_at = ?
+                WHERE username = ?
+                RETURNING username, role, full_name, password_change_required, onboarding_completed;
                 """,
-                (username,),
+                (new_hash, now_text, username),
             ).fetchone()
             if not row:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found.",
-                )
+                raise _auth_error(_USER_NOT_FOUND_ERROR)
             conn.execute(
-                """
-                UPDATE auth_users
-                SET password_hash = ?, password_change_required = 1, updated_at = datetime('now')
-                WHERE username = ?;
-                """,
-                (new_hash, username),
-            )
-            conn.execute(
-                """
-                UPDATE auth_refresh_sessions
-                SET revoked = 1, revoked_at = datetime('now')
-                WHERE username = ?;
-                """,
-                (username,),
+                _SQL_REVOKE_USER_SESSIONS,
+                (now_text, username),
             )
-        return self.get_user(username)
+        self._invalidate_cached_user(username)
+        return self._row_to_user(row)
 
     def delete_user(self, *, username: str) -> None:
         with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE;")
             row = conn.execute(
                 """
                 SELECT username, is_default
@@ -652,15 +791,9 @@ class AuthManager:
                 (username,),
             ).fetchone()
             if not row:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found.",
-                )
+                raise _auth_error(_USER_NOT_FOUND_ERROR)
             if int(row["is_default"]) == 1:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Cannot delete default system users.",
-                )
+                raise _auth_error(_DEFAULT_USER_DELETE_ERROR)
             conn.execute(
                 """
                 DELETE FROM auth_refresh_sessions
@@ -675,11 +808,72 @@ class AuthManager:
                 """,
                 (username,),
             )
+        self._invalidate_cached_user(username)
+
+    def close(self) -> None:
+        with self._failure_buffer_lock:
+            timer, self._failure_flush_timer = self._failure_flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush_login_failures()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def _cache_access_token(
+        self,
+        cache_key: bytes,
+        user: AuthUser,
+        token_exp: float,
+        *,
+        now: float,
+    ) -> None:
+        user_expires_at = min(now + _ACCESS_TOKEN_CACHE_TTL_SECONDS, token_exp)
+        with self._token_cache_lock:
+            if len(self._token_cache) >= _ACCESS_TOKEN_CACHE_MAX_ENTRIES:
+                expired = [key for key, (_, _, exp) in self._token_cache.items() if exp <= now]
+                for key in expired:
+                    del self._token_cache[key]
+                if len(self._token_cache) >= _ACCESS_TOKEN_CACHE_MAX_ENTRIES:
+                    del self._token_cache[next(iter(self._token_cache))]
+            self._token_cache[cache_key] = (user, user_expires_at, token_exp)
+
+    def _invalidate_cached_user(self, username: str) -> None:
+        with self._token_cache_lock:
+            stale = [key for key, (user, _, _) in self._token_cache.items() if user.username == username]
+            for key in stale:
+                del self._token_cache[key]
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        conn = self._open_connection()
+        with self._connections_lock:
+            self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            check_same_thread=False,
+            uri=self.db_path.startswith("file:"),
+            isolation_level=None,
+            cached_statements=256,
+        )
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON;")
+        conn.executescript(
+            """
+            PRAGMA foreign_keys = ON;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA busy_timeout = 5000;
+            PRAGMA temp_store = MEMORY;
+            """
+        )
         return conn
 
     def _init_storage(self, seed_users: list[_SeedUser]) -> None:
@@ -709,12 +903,13 @@ class AuthManager:
             FOREIGN KEY(username) REFERENCES auth_users(username)
         );
 
-        CREATE TABLE IF NOT EXISTS auth_login_failures (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+        CREATE TABLE IF NOT EXISTS auth_login_failure_counters (
             username TEXT NOT NULL,
             source_ip TEXT NOT NULL,
-            attempted_at_epoch INTEGER NOT NULL,
-            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+            window_start_epoch INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            last_failure_epoch INTEGER NOT NULL,
+            PRIMARY KEY (username, source_ip)
         );
 
         CREATE INDEX IF NOT EXISTS idx_auth_users_role
@@ -723,69 +918,144 @@ class AuthManager:
             ON auth_refresh_sessions(username);
         CREATE INDEX IF NOT EXISTS idx_auth_refresh_family
             ON auth_refresh_sessions(family_id);
-        CREATE INDEX IF NOT EXISTS idx_auth_login_failures_lookup
-            ON auth_login_failures(username, source_ip, attempted_at_epoch);
+        CREATE INDEX IF NOT EXISTS idx_auth_refresh_username_revoked
+            ON auth_refresh_sessions(username, revoked)
+            WHERE revoked = 0;
+        CREATE INDEX IF NOT EXISTS idx_auth_refresh_family_revoked
+            ON auth_refresh_sessions(family_id)
+            WHERE revoked = 0;
+        CREATE INDEX IF NOT EXISTS idx_auth_login_failure_counters_last
+            ON auth_login_failure_counters(last_failure_epoch);
         """
         with self._connect() as conn:
+            current_mode = conn.execute("PRAGMA journal_mode;").fetchone()[0]
+            if current_mode.upper() != self.journal_mode:
+                current_mode = conn.execute(
+                    f"PRAGMA journal_mode = {self.journal_mode};"
+                ).fetchone()[0]
+            self.journal_mode = current_mode.upper()
+            conn.execute("PRAGMA wal_autocheckpoint = 1000;")
             conn.executescript(schema)
-            self._ensure_auth_users_column(
-                conn,
-                column_name="onboarding_completed",
-                column_sql="INTEGER NOT NULL DEFAULT 0",
-            )
-            for seed in seed_users:
-                conn.execute(
-                    """
-                    INSERT OR IGNORE INTO auth_users (
-                        username,
-                        password_hash,
-                        role,
-                        full_name,
-                        password_change_required,
-                        onboarding_completed,
-                        is_default
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?);
-                    """,
+            schema_version = conn.execute("PRAGMA user_version;").fetchone()[0]
+            if schema_version < _AUTH_SCHEMA_VERSION:
+                conn.execute("BEGIN IMMEDIATE;")
+                if schema_version < 1:
+                    self._ensure_auth_users_columns(conn)
+                if schema_version < 2:
+                    conn.execute("DROP TABLE IF EXISTS auth_login_failures;")
+                conn.execute(f"PRAGMA user_version = {_AUTH_SCHEMA_VERSION};")
+                conn.commit()
+            if not seed_users:
+                return
+            placeholders = ", ".join("?" for _ in seed_users)
+            existing = {
+                row["username"]
+                for row in conn.execute(
+                    f"SELECT username FROM auth_users WHERE username IN ({placeholders});",
+                    [seed.username for seed in seed_users],
+                )
+            }
+            missing = [seed for seed in seed_users if seed.username not in existing]
+            if not missing:
+                return
+            pending = list(zip(missing, _hash_passwords([seed.password for seed in missing])))
+            conn.execute("BEGIN IMMEDIATE;")
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO auth_users (
+                    username,
+                    password_hash,
+                    role,
+                    full_name,
+                    password_change_required,
+                    onboarding_completed,
+                    is_default
+                )
+                VALUES (?, ?, ?, ?, ?, ?, 1);
+                """,
+                [
                     (
                         seed.username,
-                        hash_password(seed.password),
+                        password_hash,
                         seed.role,
                         seed.full_name,
                         int(seed.password_change_required),
                         int(seed.onboarding_completed),
-                        1,
-                    ),
-                )
+                    )
+                    for seed, password_hash in pending
+                ],
+            )
 
     def _get_user_row(self, username: str) -> sqlite3.Row | None:
         with self._connect() as conn:
             return conn.execute(
-                """
-                SELECT
-                    username,
-                    password_hash,
-                    role,
-                    full_name,
-                    password_change_required,
-                    onboarding_completed
-                FROM auth_users
-                WHERE username = ?;
-                """,
+                _SQL_GET_USER,
                 (username,),
             ).fetchone()
 
+    def _rehash_password(self, username: str, password: str, old_hash: str) -> None:
+        new_hash = hash_password(password)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE auth_users
+                SET password_hash = ?
+                WHERE username = ? AND password_hash = ?;
+                """,
+                (new_hash, username, old_hash),
+            )
+
+    def _maybe_prune_login_failures(self, conn: sqlite3.Connection, now_epoch: int) -> None:
+        with self._prune_lock:
+            if now_epoch - self._last_prune_epoch < _LOGIN_FAILURE_PRUNE_INTERVAL_SECONDS:
+                return
+            self._last_prune_epoch = now_epoch
+        self._prune_login_failures(conn, now_epoch)
+
     def _prune_login_failures(self, conn: sqlite3.Connection, now_epoch: int) -> None:
         retention = max(self.login_window_seconds, self.login_lockout_seconds) * 2
         cutoff_epoch = now_epoch - retention
         conn.execute(
-            """
-            DELETE FROM auth_login_failures
-            WHERE attempted_at_epoch < ?;
-            """,
+            _SQL_PRUNE_LOGIN_FAILURES,
             (cutoff_epoch,),
         )
 
+    def _schedule_failure_flush(self) -> None:
+        if self._failure_flush_timer is not None:
+            return
+        timer = threading.Timer(
+            _LOGIN_FAILURE_FLUSH_INTERVAL_SECONDS,
+            self._flush_login_failures_on_timer,
+        )
+        timer.daemon = True
+        self._failure_flush_timer = timer
+        timer.start()
+
+    def _merge_buffered_failures(
+        self,
+        *,
+        key: tuple[str, str],
+        window_start: int,
+        failure_count: int,
+        last_failure_epoch: int,
+    ) -> tuple[int, int]:
+        with self._failure_buffer_lock:
+            buffered = [epoch for epoch in self._failure_buffer.get(key, ()) if epoch >= window_start]
+        if not buffered:
+            return failure_count, last_failure_epoch
+        return failure_count + len(buffered), max(last_failure_epoch, max(buffered))
+
+    def _upsert_login_failures(
+        self,
+        conn: sqlite3.Connection,
+        rows: list[tuple[str, str, int, int, int]],
+    ) -> None:
+        window = self.login_window_seconds
+        conn.executemany(
+            _SQL_UPSERT_LOGIN_FAILURES,
+            [(*row, window, window) for row in rows],
+        )
+
     @staticmethod
     def _get_recent_failure_stats(
         *,
@@ -795,20 +1065,12 @@ class AuthManager:
         window_start: int,
     ) -> tuple[int, int]:
         row = conn.execute(
-            """
-            SELECT
-                COUNT(*) AS failure_count,
-                MAX(attempted_at_epoch) AS last_failure_epoch
-            FROM auth_login_failures
-            WHERE username = ?
-              AND source_ip = ?
-              AND attempted_at_epoch >= ?;
-            """,
+            _SQL_GET_LOGIN_FAILURE_STATS,
             (username_key, source_ip_key, window_start),
         ).fetchone()
-        failure_count = int(row["failure_count"] or 0)
-        last_failure_epoch = int(row["last_failure_epoch"] or 0)
-        return failure_count, last_failure_epoch
+        if row is None:
+            return 0, 0
+        return int(row["count"]), int(row["last_failure_epoch"])
 
     @staticmethod
     def _login_key_username(username: str) -> str:
@@ -819,72 +1081,176 @@ class AuthManager:
         value = (source_ip or "unknown").strip()
         return value or "unknown"
 
-    @staticmethod
-    def _now_epoch() -> int:
-        return int(datetime.now(timezone.utc).timestamp())
+    def _now_epoch(self) -> int:
+        return int(self.clock())
 
     @staticmethod
     def _row_to_user(row: sqlite3.Row) -> AuthUser:
+        username, role, full_name, password_change_required, onboarding_completed = row[:5]
         return AuthUser(
-            username=row["username"],
-            role=row["role"],
-            full_name=row["full_name"],
-            password_change_required=bool(row["password_change_required"]),
-            onboarding_completed=bool(row["onboarding_completed"]),
+            username=username,
+            role=role.lower(),
+            full_name=full_name,
+            password_change_required=bool(password_change_required),
+            onboarding_completed=bool(onboarding_completed),
         )
 
     @staticmethod
-    def _ensure_auth_users_column(
-        conn: sqlite3.Connection,
-        *,
-        column_name: str,
-        column_sql: str,
-    ) -> None:
-        existing = conn.execute("PRAGMA table_info(auth_users);").fetchall()
-        names = {row["name"] for row in existing}
-        if column_name in names:
-            return
-        conn.execute(f"ALTER TABLE auth_users ADD COLUMN {column_name} {column_sql};")
+    def _ensure_auth_users_columns(conn: sqlite3.Connection) -> None:
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(auth_users);")}
+        for column_name, column_sql in _AUTH_USERS_MIGRATED_COLUMNS.items():
+            if column_name not in existing:
+                conn.execute(f"ALTER TABLE auth_users ADD COLUMN {column_name} {column_sql};")
+
+    def _encode_token(self, payload: dict[str, Any]) -> str:
+        if self._hmac_digest is None:
+            return jwt.encode(payload, self._signing_key, algorithm=self.algorithm)
+        body = (
+            self._jwt_header_b64
+            + b"."
+            + _b64url_encode(_json_compact(payload))
+        )
+        signature = hmac.new(self._signing_key, body, self._hmac_digest).digest()
+        return (body + b"." + _b64url_encode(signature)).decode("ascii")
 
-    def _decode_token(self, token: str, *, verify_exp: bool = True) -> dict[str, Any]:
+    def _decode_token(
+        self,
+        token: str,
+        *,
+        verify_exp: bool = True,
+        required: list[str] | None = None,
+    ) -> dict[str, Any]:
         try:
             return jwt.decode(
                 token,
-                self.secret_key,
+                self._verifying_key,
                 algorithms=[self.algorithm],
-                options={"verify_exp": verify_exp},
+                options={"verify_exp": verify_exp, "require": required or []},
+                leeway=0,
             )
         except PyJWTError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token.",
-            ) from exc
+            raise _auth_error(_INVALID_TOKEN_ERROR) from exc
 
 
-def hash_password(password: str) -> str:
-    iterations = 390_000
-    salt = secrets.token_bytes(16)
-    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
-    salt_b64 = base64.urlsafe_b64encode(salt).decode("ascii")
-    digest_b64 = base64.urlsafe_b64encode(digest).decode("ascii")
-    return f"pbkdf2_sha256${iterations}${salt_b64}${digest_b64}"
+def hash_password(password: str, *, salt: bytes | None = None) -> str:
+    if salt is None:
+        salt = secrets.token_bytes(_SALT_BYTES)
+    if not _SCRYPT_AVAILABLE:
+        iterations = _PBKDF2_SHA512_ITERATIONS
+        digest = hashlib.pbkdf2_hmac("sha512", password.encode("utf-8"), salt, iterations)
+        return f"pbkdf2_sha512-hex${iterations}${salt.hex()}${digest.hex()}"
+    digest = _scrypt(password, salt, n=_SCRYPT_N, r=_SCRYPT_R, p=_SCRYPT_P)
+    return f"scrypt-hex${_SCRYPT_N}${_SCRYPT_R}${_SCRYPT_P}${salt.hex()}${digest.hex()}"
 
 
 def verify_password(password: str, stored_hash: str) -> bool:
     try:
-        scheme, iterations_raw, salt_b64, digest_b64 = stored_hash.split("$", 3)
-        if scheme != "pbkdf2_sha256":
+        tagged_scheme, params = stored_hash.split("$", 1)
+        scheme, _, encoding = tagged_scheme.partition("-")
+        decode_field = _HASH_FIELD_DECODERS[encoding]
+        if scheme == "scrypt":
+            n_raw, r_raw, p_raw, salt_raw, digest_raw = params.split("$", 4)
+            n, r, p = int(n_raw), int(r_raw), int(p_raw)
+        elif scheme in _PBKDF2_SCHEMES:
+            iterations_raw, salt_raw, digest_raw = params.split("$", 2)
+            iterations = int(iterations_raw)
+        else:
             return False
-        iterations = int(iterations_raw)
-        salt = base64.urlsafe_b64decode(salt_b64.encode("ascii"))
-        expected = base64.urlsafe_b64decode(digest_b64.encode("ascii"))
+        salt = decode_field(salt_raw)
+        expected = decode_field(digest_raw)
     except Exception:
         return False
 
-    candidate = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    if scheme == "scrypt":
+        try:
+            candidate = _scrypt(password, salt, n=n, r=r, p=p)
+        except (ValueError, AttributeError):
+            return False
+    else:
+        candidate = hashlib.pbkdf2_hmac(
+            _PBKDF2_SCHEMES[scheme],
+            password.encode("utf-8"),
+            salt,
+            iterations,
+        )
     return hmac.compare_digest(candidate, expected)
 
 
+def _decode_b64_field(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value.encode("ascii"))
+
+
+_HASH_FIELD_DECODERS = {"": _decode_b64_field, "hex": bytes.fromhex}
+
+
+def _hash_passwords(passwords: list[str]) -> list[str]:
+    entropy = secrets.token_bytes(_SALT_BYTES * len(passwords))
+    salts = [entropy[i : i + _SALT_BYTES] for i in range(0, len(entropy), _SALT_BYTES)]
+    if len(passwords) < 2:
+        return [hash_password(password, salt=salt) for password, salt in zip(passwords, salts)]
+    workers = min(len(passwords), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda item: hash_password(item[0], salt=item[1]), zip(passwords, salts)))
+
+
+def password_needs_rehash(stored_hash: str) -> bool:
+    if not _SCRYPT_AVAILABLE:
+        return not stored_hash.startswith(f"pbkdf2_sha512-hex${_PBKDF2_SHA512_ITERATIONS}$")
+    return not stored_hash.startswith(f"scrypt-hex${_SCRYPT_N}${_SCRYPT_R}${_SCRYPT_P}$")
+
+
+def _scrypt(password: str, salt: bytes, *, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=_SCRYPT_MAXMEM,
+        dklen=32,
+    )
+
+
+def _role_mask(roles: tuple[str, ...]) -> int:
+    mask = 0
+    for role in roles:
+        flag = RoleFlag.__members__.get(role.upper())
+        if flag is not None:
+            mask |= int(flag)
+    return mask
+
+
+def _db_timestamp(epoch: float | None = None) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch))
+
+
+def _json_compact(payload: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(raw: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _b64url_encode(raw: bytes) -> bytes:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+
+def _prepare_jwt_keys(secret_key: str, algorithm: str) -> tuple[Any, Any]:
+    if algorithm.upper().startswith("HS"):
+        key = secret_key.encode("utf-8")
+        return key, key
+    signing_key = jwt.get_algorithm_by_name(algorithm).prepare_key(secret_key)
+    public_key = getattr(signing_key, "public_key", None)
+    if callable(public_key):
+        return signing_key, public_key()
+    return signing_key, signing_key
+
+
 def _env_bool(name: str, default: bool) -> bool:
     raw = os.getenv(name)
     if raw is None:
@@ -911,7 +1277,7 @@ def _load_seed_users(*, force_change_defaults: bool) -> list[_SeedUser]:
         return _default_seed_users(force_change_defaults=force_change_defaults)
 
     try:
-        data = json.loads(raw)
+        data = _json_loads(raw)
     except json.JSONDecodeError:
         return _default_seed_users(force_change_defaults=force_change_defaults)
 
@@ -975,10 +1341,7 @@ bearer_scheme = HTTPBearer(auto_error=False)
 def get_auth_manager(request: Request) -> AuthManager:
     manager = getattr(request.app.state, "auth_manager", None)
     if not manager:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Auth manager unavailable.",
-        )
+        raise _auth_error(_AUTH_UNAVAILABLE_ERROR)
     return manager
 
 
@@ -987,32 +1350,22 @@ def get_current_user(
     auth_manager: AuthManager = Depends(get_auth_manager),
 ) -> AuthUser:
     if not credentials:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing bearer token.",
-        )
+        raise _auth_error(_MISSING_TOKEN_ERROR)
     return auth_manager.parse_access_token(credentials.credentials)
 
 
 def require_roles(*roles: str):
-    allowed = {role.lower() for role in roles}
+    allowed_mask = _role_mask(roles)
 
     def _dependency(user: AuthUser = Depends(get_current_user)) -> AuthUser:
+        if user.role_flag & allowed_mask and user.onboarding_completed and not user.password_change_required:
+            return user
         if user.password_change_required:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Password change is required before accessing this resource.",
-            )
+            raise _auth_error(_PWD_CHANGE_ERROR)
         if not user.onboarding_completed:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Onboarding is required before accessing this resource.",
-            )
-        if user.role.lower() not in allowed:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Insufficient role privileges.",
-            )
+            raise _auth_error(_ONBOARDING_ERROR)
+        if not user.role_flag & allowed_mask:
+            raise _auth_error(_ROLE_ERROR)
         return user
 
     return _dependency
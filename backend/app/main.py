@@ -3,6 +3,8 @@ from __future__ import annotations
 import ipaddress
 import os
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Annotated, AsyncIterator
 
 from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request, status
@@ -76,7 +78,25 @@ def _parse_trusted_proxy_networks(raw: str | None) -> list[ipaddress._BaseNetwor
     return networks
 
 
-def _request_from_trusted_proxy(request: Request, trusted_networks: list[ipaddress._BaseNetwork]) -> bool:
+@dataclass(frozen=True, slots=True)
+class AuthRuntimeConfig:
+    trust_forwarded: bool = False
+    trusted_networks: tuple[ipaddress._BaseNetwork, ...] = ()
+
+    @classmethod
+    def from_env(cls) -> "AuthRuntimeConfig":
+        return cls(
+            trust_forwarded=_env_bool("TRIAGE_AUTH_TRUST_X_FORWARDED_FOR", False),
+            trusted_networks=tuple(
+                _parse_trusted_proxy_networks(os.getenv("TRIAGE_AUTH_TRUSTED_PROXY_CIDRS"))
+            ),
+        )
+
+
+def _request_from_trusted_proxy(
+    request: Request,
+    trusted_networks: tuple[ipaddress._BaseNetwork, ...],
+) -> bool:
     if not trusted_networks:
         return True
     host = request.client.host if request.client else ""
@@ -89,26 +109,14 @@ def _request_from_trusted_proxy(request: Request, trusted_networks: list[ipaddre
     return any(source_ip in network for network in trusted_networks)
 
 
-def _forwarded_ip_candidate(raw: str) -> str | None:
-    value = raw.strip()
-    if not value:
-        return None
-    try:
-        parsed = ipaddress.ip_address(value)
-        return str(parsed)
-    except ValueError:
-        return None
-
-
-def _request_source_ip(request: Request) -> str:
-    trust_forwarded = _env_bool("TRIAGE_AUTH_TRUST_X_FORWARDED_FOR", False)
-    trusted_networks = _parse_trusted_proxy_networks(os.getenv("TRIAGE_AUTH_TRUSTED_PROXY_CIDRS"))
-    if trust_forwarded and _request_from_trusted_proxy(request, trusted_networks):
-        forwarded = request.headers.get("x-forwarded-for", "")
-        for part in forwarded.split(","):
-            candidate = _forwarded_ip_candidate(part)
-            if candidate:
-                return candidate
+def _request_source_ip(request: Request, runtime: AuthRuntimeConfig) -> str:
+    if runtime.trust_forwarded and _request_from_trusted_proxy(request, runtime.trusted_networks):
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            try:
+                return str(ipaddress.ip_address(forwarded.partition(",")[0].strip()))
+            except ValueError:
+                pass
     if request.client and request.client.host:
         return request.client.host
     return "unknown"
@@ -116,7 +124,7 @@ def _request_source_ip(request: Request) -> str:
 
 def _build_service() -> TriageService:
     config = TriageConfig.from_env()
-    repository = SQLiteRepository(config.db_path)
+    repository = SQLiteRepository(config.db_path, journal_mode=config.sqlite_journal_mode)
     repository.init_db()
     repository.seed_slots_if_empty(config)
     reasoner, reasoner_label = build_reasoner(config)
@@ -172,6 +180,7 @@ def _appointment_out(value) -> AppointmentResultOut:
     )
 
 
+@lru_cache(maxsize=1024)
 def _auth_user_out(value: AuthUser) -> AuthUserResponse:
     return AuthUserResponse(
         username=value.username,
@@ -186,13 +195,19 @@ def _auth_user_out(value: AuthUser) -> AuthUserResponse:
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     app.state.triage_service = _build_service()
     app.state.auth_manager = AuthManager.from_env()
+    app.state.auth_runtime = AuthRuntimeConfig.from_env()
+    app.openapi()
     try:
         yield
     finally:
         if hasattr(app.state, "triage_service"):
+            app.state.triage_service.repository.close()
             delattr(app.state, "triage_service")
         if hasattr(app.state, "auth_manager"):
+            app.state.auth_manager.close()
             delattr(app.state, "auth_manager")
+        if hasattr(app.state, "auth_runtime"):
+            delattr(app.state, "auth_runtime")
 
 
 def get_service(request: Request) -> TriageService:
@@ -209,11 +224,21 @@ def get_auth_manager(request: Request) -> AuthManager:
     return manager
 
 
+def get_auth_runtime(request: Request) -> AuthRuntimeConfig:
+    runtime = getattr(request.app.state, "auth_runtime", None)
+    if not runtime:
+        raise HTTPException(status_code=503, detail="Auth runtime config is not initialized.")
+    return runtime
+
+
 ServiceDep = Annotated[TriageService, Depends(get_service)]
 AuthManagerDep = Annotated[AuthManager, Depends(get_auth_manager)]
-StaffDep = Annotated[AuthUser, Depends(require_roles("operations", "nurse", "admin"))]
-NurseDep = Annotated[AuthUser, Depends(require_roles("nurse", "admin"))]
-AdminDep = Annotated[AuthUser, Depends(require_roles("admin"))]
+AuthRuntimeDep = Annotated[AuthRuntimeConfig, Depends(get_auth_runtime)]
+_require_staff = require_roles("operations", "nurse", "admin")
+_require_nurse = require_roles("nurse", "admin")
+_require_admin = require_roles("admin")
+
+StaffDep = Annotated[AuthUser, Depends(_require_staff)]
 CurrentUserDep = Annotated[AuthUser, Depends(get_current_user)]
 
 router = APIRouter()
@@ -225,8 +250,13 @@ def health() -> HealthResponse:
 
 
 @router.post("/api/v1/auth/login", response_model=AuthTokenResponse, tags=["auth"])
-def login(payload: AuthLoginRequest, request: Request, auth_manager: AuthManagerDep) -> AuthTokenResponse:
-    source_ip = _request_source_ip(request)
+def login(
+    payload: AuthLoginRequest,
+    request: Request,
+    auth_manager: AuthManagerDep,
+    auth_runtime: AuthRuntimeDep,
+) -> AuthTokenResponse:
+    source_ip = _request_source_ip(request, auth_runtime)
     is_allowed, retry_after_seconds = auth_manager.check_login_allowed(payload.username, source_ip)
     if not is_allowed:
         raise HTTPException(
@@ -320,26 +350,40 @@ def complete_onboarding(
     return _auth_user_out(updated_user)
 
 
-@router.post("/api/v1/auth/onboarding-reset", response_model=AuthUserResponse, tags=["auth"])
+@router.post(
+    "/api/v1/auth/onboarding-reset",
+    response_model=AuthUserResponse,
+    tags=["auth"],
+    dependencies=[Depends(_require_admin)],
+)
 def reset_onboarding(
     payload: AuthResetOnboardingRequest,
-    _: AdminDep,
     auth_manager: AuthManagerDep,
 ) -> AuthUserResponse:
     updated_user = auth_manager.reset_onboarding(username=payload.username)
     return _auth_user_out(updated_user)
 
 
-@router.get("/api/v1/users", response_model=UserListResponse, tags=["users"])
-def list_users(_: AdminDep, auth_manager: AuthManagerDep) -> UserListResponse:
+@router.get(
+    "/api/v1/users",
+    response_model=UserListResponse,
+    tags=["users"],
+    dependencies=[Depends(_require_admin)],
+)
+def list_users(auth_manager: AuthManagerDep) -> UserListResponse:
     users = auth_manager.list_users()
     return UserListResponse(users=[_auth_user_out(user) for user in users])
 
 
-@router.post("/api/v1/users", response_model=AuthUserResponse, tags=["users"], status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/api/v1/users",
+    response_model=AuthUserResponse,
+    tags=["users"],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(_require_admin)],
+)
 def create_user(
     payload: UserCreateRequest,
-    _: AdminDep,
     auth_manager: AuthManagerDep,
 ) -> AuthUserResponse:
     user = auth_manager.create_user(
@@ -351,11 +395,15 @@ def create_user(
     return _auth_user_out(user)
 
 
-@router.put("/api/v1/users/{username}", response_model=AuthUserResponse, tags=["users"])
+@router.put(
+    "/api/v1/users/{username}",
+    response_model=AuthUserResponse,
+    tags=["users"],
+    dependencies=[Depends(_require_admin)],
+)
 def update_user(
     username: str,
     payload: UserUpdateRequest,
-    _: AdminDep,
     auth_manager: AuthManagerDep,
 ) -> AuthUserResponse:
     user = auth_manager.update_user(
@@ -366,11 +414,15 @@ def update_user(
     return _auth_user_out(user)
 
 
-@router.post("/api/v1/users/{username}/reset-password", response_model=AuthUserResponse, tags=["users"])
+@router.post(
+    "/api/v1/users/{username}/reset-password",
+    response_model=AuthUserResponse,
+    tags=["users"],
+    dependencies=[Depends(_require_admin)],
+)
 def admin_reset_password(
     username: str,
     payload: AdminResetPasswordRequest,
-    _: AdminDep,
     auth_manager: AuthManagerDep,
 ) -> AuthUserResponse:
     user = auth_manager.admin_reset_password(
@@ -380,17 +432,26 @@ def admin_reset_password(
     return _auth_user_out(user)
 
 
-@router.delete("/api/v1/users/{username}", tags=["users"], status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/api/v1/users/{username}",
+    tags=["users"],
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(_require_admin)],
+)
 def delete_user(
     username: str,
-    _: AdminDep,
     auth_manager: AuthManagerDep,
 ) -> None:
     auth_manager.delete_user(username=username)
 
 
-@router.post("/api/v1/triage/intake", response_model=IntakeResponse, tags=["triage"])
-def intake(payload: IntakeRequest, service: ServiceDep, _: StaffDep) -> IntakeResponse:
+@router.post(
+    "/api/v1/triage/intake",
+    response_model=IntakeResponse,
+    tags=["triage"],
+    dependencies=[Depends(_require_staff)],
+)
+def intake(payload: IntakeRequest, service: ServiceDep) -> IntakeResponse:
     outcome = service.process_intake(
         phone=payload.phone,
         age=payload.age,
@@ -411,22 +472,30 @@ def intake(payload: IntakeRequest, service: ServiceDep, _: StaffDep) -> IntakeRe
     )
 
 
-@router.get("/api/v1/queue", response_model=QueueListResponse, tags=["queue"])
+@router.get(
+    "/api/v1/queue",
+    response_model=QueueListResponse,
+    tags=["queue"],
+    dependencies=[Depends(_require_nurse)],
+)
 def list_queue(
     service: ServiceDep,
-    _: NurseDep,
     status: str = Query(default="PENDING"),
 ) -> QueueListResponse:
     items = service.list_queue(status=status)
     return QueueListResponse(items=items)
 
 
-@router.post("/api/v1/queue/{queue_id}/book", response_model=QueueBookResponse, tags=["queue"])
+@router.post(
+    "/api/v1/queue/{queue_id}/book",
+    response_model=QueueBookResponse,
+    tags=["queue"],
+    dependencies=[Depends(_require_nurse)],
+)
 def book_queue_item(
     queue_id: int,
     payload: QueueBookRequest,
     service: ServiceDep,
-    _: NurseDep,
 ) -> QueueBookResponse:
     urgency = Urgency(payload.urgency_override) if payload.urgency_override else None
     appointment = service.book_from_queue(
@@ -439,8 +508,13 @@ def book_queue_item(
     return QueueBookResponse(queue_id=queue_id, appointment_result=_appointment_out(appointment))
 
 
-@router.get("/api/v1/dashboard/metrics", response_model=DashboardMetricsResponse, tags=["dashboard"])
-def dashboard_metrics(service: ServiceDep, _: StaffDep) -> DashboardMetricsResponse:
+@router.get(
+    "/api/v1/dashboard/metrics",
+    response_model=DashboardMetricsResponse,
+    tags=["dashboard"],
+    dependencies=[Depends(_require_staff)],
+)
+def dashboard_metrics(service: ServiceDep) -> DashboardMetricsResponse:
     return DashboardMetricsResponse(**service.get_dashboard_metrics())
 
 
@@ -463,10 +537,10 @@ def dashboard_appointments(
     "/api/v1/dashboard/activity",
     response_model=DashboardActivityResponse,
     tags=["dashboard"],
+    dependencies=[Depends(_require_staff)],
 )
 def dashboard_activity(
     service: ServiceDep,
-    _: StaffDep,
     limit: int = Query(default=30, ge=1, le=500),
 ) -> DashboardActivityResponse:
     return DashboardActivityResponse(items=service.recent_activity(limit=limit))
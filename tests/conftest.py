@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import sqlite3
+import uuid
+from typing import Iterator
+
+import pytest
+
+from triage_agent.database import SQLiteRepository
+
+
+def _memory_db_uri() -> str:
+    return f"file:triage-{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+
+@pytest.fixture(scope="session")
+def _template_db() -> Iterator[sqlite3.Connection]:
+    db_uri = _memory_db_uri()
+    source = sqlite3.connect(db_uri, uri=True)
+    SQLiteRepository(db_uri).init_db()
+    template = sqlite3.connect(":memory:")
+    source.backup(template)
+    source.close()
+    try:
+        yield template
+    finally:
+        template.close()
+
+
+@pytest.fixture
+def repo(_template_db: sqlite3.Connection) -> Iterator[SQLiteRepository]:
+    db_uri = _memory_db_uri()
+    keepalive = sqlite3.connect(db_uri, uri=True)
+    _template_db.backup(keepalive)
+    repository = SQLiteRepository(db_uri)
+    try:
+        yield repository
+    finally:
+        repository.close()
+        keepalive.close()
@@ -1,17 +1,105 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
+import inspect
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator
+
+import httpx
+import jwt
+import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from backend.app.main import create_app
+from backend.app import auth
+from backend.app.main import create_app, router
 
 
-def _client(tmp_path, monkeypatch) -> TestClient:
-    monkeypatch.setenv("TRIAGE_DB_PATH", str(tmp_path / "api_test.db"))
-    monkeypatch.setenv("TRIAGE_REASONER_MODE", "heuristic")
-    monkeypatch.setenv("TRIAGE_NOTIFICATIONS_ENABLED", "false")
-    monkeypatch.setenv("TRIAGE_AUTH_FORCE_CHANGE_DEFAULTS", "true")
-    app = create_app()
-    return TestClient(app)
+_INTAKE_REQUEST = {
+    "phone": "5551234567",
+    "age": 31,
+    "sex": "Female",
+    "symptoms": "cold and fatigue for two days",
+    "auto_book_high_urgency": True,
+    "always_route_when_model_requests_human": True,
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _fast_password_hashing() -> Iterator[None]:
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(auth, "_SCRYPT_N", 2**4)
+        monkeypatch.setattr(auth, "_PBKDF2_SHA512_ITERATIONS", 1_000)
+        yield
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _base_env() -> Iterator[None]:
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("TRIAGE_REASONER_MODE", "heuristic")
+        monkeypatch.setenv("TRIAGE_NOTIFICATIONS_ENABLED", "false")
+        monkeypatch.setenv("TRIAGE_AUTH_FORCE_CHANGE_DEFAULTS", "true")
+        yield
+
+
+@lru_cache(maxsize=1)
+def _app() -> FastAPI:
+    return create_app()
+
+
+def _configure_env(monkeypatch) -> str:
+    db_uri = f"file:triage-{uuid.uuid4().hex}?mode=memory&cache=shared"
+    monkeypatch.setenv("TRIAGE_DB_PATH", db_uri)
+    return db_uri
+
+
+@contextmanager
+def _client(monkeypatch) -> Iterator[TestClient]:
+    db_uri = _configure_env(monkeypatch)
+    keepalive = sqlite3.connect(db_uri, uri=True)
+    try:
+        with TestClient(_app()) as client:
+            yield client
+    finally:
+        keepalive.close()
+
+
+@pytest.fixture(scope="module")
+def _seeded_app() -> Iterator[tuple[FastAPI, sqlite3.Connection, sqlite3.Connection]]:
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        db_uri = _configure_env(monkeypatch)
+        live = sqlite3.connect(db_uri, uri=True)
+        snapshot = sqlite3.connect(":memory:")
+        app = _app()
+        with TestClient(app):
+            pass
+        live.backup(snapshot)
+        try:
+            yield app, live, snapshot
+        finally:
+            snapshot.close()
+            live.close()
+
+
+@pytest.fixture
+def client(_seeded_app) -> Iterator[TestClient]:
+    app, live, snapshot = _seeded_app
+    snapshot.backup(live)
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 def _login(client: TestClient, *, username: str, password: str) -> dict:
@@ -44,9 +132,10 @@ def _complete_first_login(
             headers={"Authorization": f"Bearer {token}"},
         )
         assert changed.status_code == 200
-        token = changed.json()["access_token"]
-        refresh_token = changed.json()["refresh_token"]
-        user = changed.json()["user"]
+        changed_body = changed.json()
+        token = changed_body["access_token"]
+        refresh_token = changed_body["refresh_token"]
+        user = changed_body["user"]
 
     if not user["onboarding_completed"]:
         onboarded = client.post(
@@ -62,221 +151,412 @@ def _complete_first_login(
     }
 
 
-def test_health_endpoint(tmp_path, monkeypatch) -> None:
-    with _client(tmp_path, monkeypatch) as client:
-        response = client.get("/health")
-        assert response.status_code == 200
-        payload = response.json()
-        assert payload["status"] == "ok"
-        assert payload["service"] == "healthcare-triage-api"
+def test_health_endpoint(client: TestClient) -> None:
+    response = client.get("/health")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["status"] == "ok"
+    assert payload["service"] == "healthcare-triage-api"
 
 
-def test_password_change_required_is_enforced(tmp_path, monkeypatch) -> None:
-    with _client(tmp_path, monkeypatch) as client:
-        login = _login(client, username="ops", password="ops123")
-        assert login["user"]["password_change_required"] is True
-        assert login["user"]["onboarding_completed"] is False
+def test_openapi_schema_is_built_at_startup(client: TestClient) -> None:
+    assert client.app.openapi_schema is not None
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert "/api/v1/auth/login" in response.json()["paths"]
 
-        blocked = client.get(
-            "/api/v1/dashboard/metrics",
-            headers={"Authorization": f"Bearer {login['access_token']}"},
-        )
-        assert blocked.status_code == 403
-        assert "Password change is required" in blocked.json()["detail"]
 
-        changed = client.post(
-            "/api/v1/auth/change-password",
-            json={
-                "current_password": "ops123",
-                "new_password": "ops123_new1",
-            },
-            headers={"Authorization": f"Bearer {login['access_token']}"},
-        )
-        assert changed.status_code == 200
-        assert changed.json()["user"]["password_change_required"] is False
-        assert changed.json()["user"]["onboarding_completed"] is False
+def test_password_hashing_routes_stay_in_threadpool() -> None:
+    hashing_routes = {
+        ("POST", "/api/v1/auth/login"),
+        ("POST", "/api/v1/auth/change-password"),
+        ("POST", "/api/v1/users"),
+        ("POST", "/api/v1/users/{username}/reset-password"),
+    }
+    seen = set()
+    for route in router.routes:
+        for method in route.methods:
+            if (method, route.path) in hashing_routes:
+                seen.add((method, route.path))
+                assert not inspect.iscoroutinefunction(route.endpoint)
+    assert seen == hashing_routes
+
+
+def test_password_change_required_is_enforced(client: TestClient) -> None:
+    login = _login(client, username="ops", password="ops123")
+    assert login["user"]["password_change_required"] is True
+    assert login["user"]["onboarding_completed"] is False
+
+    blocked = client.get(
+        "/api/v1/dashboard/metrics",
+        headers={"Authorization": f"Bearer {login['access_token']}"},
+    )
+    assert blocked.status_code == 403
+    assert "Password change is required" in blocked.json()["detail"]
+
+    changed = client.post(
+        "/api/v1/auth/change-password",
+        json={
+            "current_password": "ops123",
+            "new_password": "ops123_new1",
+        },
+        headers={"Authorization": f"Bearer {login['access_token']}"},
+    )
+    assert changed.status_code == 200
+    changed_body = changed.json()
+    assert changed_body["user"]["password_change_required"] is False
+    assert changed_body["user"]["onboarding_completed"] is False
+    changed_headers = {"Authorization": f"Bearer {changed_body['access_token']}"}
+
+    blocked_for_onboarding = client.get(
+        "/api/v1/dashboard/metrics",
+        headers=changed_headers,
+    )
+    assert blocked_for_onboarding.status_code == 403
+    assert "Onboarding is required" in blocked_for_onboarding.json()["detail"]
 
-        blocked_for_onboarding = client.get(
-            "/api/v1/dashboard/metrics",
-            headers={"Authorization": f"Bearer {changed.json()['access_token']}"},
-        )
-        assert blocked_for_onboarding.status_code == 403
-        assert "Onboarding is required" in blocked_for_onboarding.json()["detail"]
+    onboarded = client.post(
+        "/api/v1/auth/onboarding-complete",
+        headers=changed_headers,
+    )
+    assert onboarded.status_code == 200
+    assert onboarded.json()["onboarding_completed"] is True
 
-        onboarded = client.post(
-            "/api/v1/auth/onboarding-complete",
-            headers={"Authorization": f"Bearer {changed.json()['access_token']}"},
-        )
-        assert onboarded.status_code == 200
-        assert onboarded.json()["onboarding_completed"] is True
+    metrics = client.get(
+        "/api/v1/dashboard/metrics",
+        headers=changed_headers,
+    )
+    assert metrics.status_code == 200
 
-        metrics = client.get(
-            "/api/v1/dashboard/metrics",
-            headers={"Authorization": f"Bearer {changed.json()['access_token']}"},
-        )
-        assert metrics.status_code == 200
+    stale = client.post(
+        "/api/v1/auth/login",
+        json={"username": "ops", "password": "ops123"},
+    )
+    assert stale.status_code == 401
+    _login(client, username="ops", password="ops123_new1")
 
 
-def test_admin_can_reset_onboarding(tmp_path, monkeypatch) -> None:
-    with _client(tmp_path, monkeypatch) as client:
-        admin_session = _complete_first_login(client, username="admin", password="admin123")
-        ops_session = _complete_first_login(client, username="ops", password="ops123")
-        admin_headers = {"Authorization": admin_session["authorization"]}
-        ops_headers = {"Authorization": ops_session["authorization"]}
+def test_admin_can_reset_onboarding(client: TestClient) -> None:
+    admin_session = _complete_first_login(client, username="admin", password="admin123")
+    ops_session = _complete_first_login(client, username="ops", password="ops123")
+    admin_headers = {"Authorization": admin_session["authorization"]}
+    ops_headers = {"Authorization": ops_session["authorization"]}
 
-        reset = client.post(
-            "/api/v1/auth/onboarding-reset",
-            json={"username": "ops"},
-            headers=admin_headers,
-        )
-        assert reset.status_code == 200
-        assert reset.json()["username"] == "ops"
-        assert reset.json()["onboarding_completed"] is False
-
-        blocked = client.get("/api/v1/dashboard/metrics", headers=ops_headers)
-        assert blocked.status_code == 403
-        assert "Onboarding is required" in blocked.json()["detail"]
-
-        forbidden = client.post(
-            "/api/v1/auth/onboarding-reset",
-            json={"username": "nurse"},
-            headers=ops_headers,
-        )
-        assert forbidden.status_code == 403
+    reset = client.post(
+        "/api/v1/auth/onboarding-reset",
+        json={"username": "ops"},
+        headers=admin_headers,
+    )
+    assert reset.status_code == 200
+    reset_body = reset.json()
+    assert reset_body["username"] == "ops"
+    assert reset_body["onboarding_completed"] is False
+
+    blocked = client.get("/api/v1/dashboard/metrics", headers=ops_headers)
+    assert blocked.status_code == 403
+    assert "Onboarding is required" in blocked.json()["detail"]
+
+    forbidden = client.post(
+        "/api/v1/auth/onboarding-reset",
+        json={"username": "nurse"},
+        headers=ops_headers,
+    )
+    assert forbidden.status_code == 403
 
 
-def test_refresh_token_rotation_and_reuse_detection(tmp_path, monkeypatch) -> None:
-    with _client(tmp_path, monkeypatch) as client:
-        session = _complete_first_login(client, username="admin", password="admin123")
-        first_refresh = session["refresh_token"]
+def test_admin_can_update_user(client: TestClient) -> None:
+    admin_session = _complete_first_login(client, username="admin", password="admin123")
+    admin_headers = {"Authorization": admin_session["authorization"]}
+
+    renamed = client.put(
+        "/api/v1/users/ops",
+        json={"full_name": "Ops Lead"},
+        headers=admin_headers,
+    )
+    assert renamed.status_code == 200
+    renamed_body = renamed.json()
+    assert renamed_body["full_name"] == "Ops Lead"
+    assert renamed_body["role"] == "operations"
+
+    promoted = client.put(
+        "/api/v1/users/ops",
+        json={"role": "admin"},
+        headers=admin_headers,
+    )
+    assert promoted.status_code == 200
+    promoted_body = promoted.json()
+    assert promoted_body["full_name"] == "Ops Lead"
+    assert promoted_body["role"] == "admin"
+
+    missing = client.put(
+        "/api/v1/users/ghost",
+        json={"full_name": "Nobody"},
+        headers=admin_headers,
+    )
+    assert missing.status_code == 404
+
+
+def test_admin_can_create_user_and_reset_password(client: TestClient) -> None:
+    admin_session = _complete_first_login(client, username="admin", password="admin123")
+    admin_headers = {"Authorization": admin_session["authorization"]}
+
+    created = client.post(
+        "/api/v1/users",
+        json={
+            "username": "charge-nurse",
+            "password": "charge123",
+            "role": "nurse",
+            "full_name": "Charge Nurse",
+        },
+        headers=admin_headers,
+    )
+    assert created.status_code == 201
+    created_body = created.json()
+    assert created_body["username"] == "charge-nurse"
+    assert created_body["full_name"] == "Charge Nurse"
+    assert created_body["password_change_required"] is True
+    assert created_body["onboarding_completed"] is False
+
+    duplicate = client.post(
+        "/api/v1/users",
+        json={"username": "charge-nurse", "password": "charge123", "role": "nurse"},
+        headers=admin_headers,
+    )
+    assert duplicate.status_code == 409
+
+    _complete_first_login(client, username="charge-nurse", password="charge123")
+    reset = client.post(
+        "/api/v1/users/charge-nurse/reset-password",
+        json={"username": "charge-nurse", "new_password": "charge456"},
+        headers=admin_headers,
+    )
+    assert reset.status_code == 200
+    reset_body = reset.json()
+    assert reset_body["password_change_required"] is True
+    assert reset_body["onboarding_completed"] is True
+
+    login = _login(client, username="charge-nurse", password="charge456")
+    assert login["user"]["password_change_required"] is True
 
-        rotated = client.post(
-            "/api/v1/auth/refresh",
-            json={"refresh_token": first_refresh},
-        )
-        assert rotated.status_code == 200
-        second_refresh = rotated.json()["refresh_token"]
 
-        reused = client.post(
-            "/api/v1/auth/refresh",
-            json={"refresh_token": first_refresh},
+def test_legacy_pbkdf2_hash_is_upgraded_on_login(client: TestClient) -> None:
+    salt = b"0123456789abcdef"
+    digest = hashlib.pbkdf2_hmac("sha256", b"admin123", salt, 1000)
+    legacy_hash = "pbkdf2_sha256$1000${}${}".format(
+        base64.urlsafe_b64encode(salt).decode("ascii"),
+        base64.urlsafe_b64encode(digest).decode("ascii"),
+    )
+    db_uri = os.environ["TRIAGE_DB_PATH"]
+    with sqlite3.connect(db_uri, uri=True) as conn:
+        conn.execute(
+            "UPDATE auth_users SET password_hash = ? WHERE username = 'admin';",
+            (legacy_hash,),
         )
-        assert reused.status_code == 401
 
-        still_valid = client.post(
-            "/api/v1/auth/refresh",
-            json={"refresh_token": second_refresh},
+    _login(client, username="admin", password="admin123")
+
+    with sqlite3.connect(db_uri, uri=True) as conn:
+        stored = conn.execute(
+            "SELECT password_hash FROM auth_users WHERE username = 'admin';"
+        ).fetchone()[0]
+    assert stored.startswith("scrypt-hex$")
+    _login(client, username="admin", password="admin123")
+
+
+def test_pbkdf2_sha512_fallback_when_scrypt_is_unavailable(monkeypatch) -> None:
+    monkeypatch.setattr(auth, "_SCRYPT_AVAILABLE", False)
+    stored = auth.hash_password("fallback123")
+    assert stored.startswith("pbkdf2_sha512-hex$")
+    assert auth.verify_password("fallback123", stored)
+    assert not auth.verify_password("fallback124", stored)
+    assert not auth.password_needs_rehash(stored)
+
+
+def test_scrypt_default_cost_fits_memory_cap(monkeypatch) -> None:
+    monkeypatch.setattr(auth, "_SCRYPT_N", 2**14)
+    stored = auth.hash_password("default123")
+    assert stored.startswith("scrypt-hex$16384$8$5$")
+    assert auth.verify_password("default123", stored)
+    assert not auth.password_needs_rehash(stored)
+
+    salt = b"\x00" * 16
+    costly = "scrypt-hex$32768$8$5${}${}".format(salt.hex(), "00" * 32)
+    assert not auth.verify_password("default123", costly)
+    assert auth.password_needs_rehash(costly)
+
+
+def test_untagged_hash_fields_are_always_base64() -> None:
+    salt_b64 = "abcdef0123456789abcdef01"
+    salt = base64.urlsafe_b64decode(salt_b64)
+    digest = hashlib.scrypt(b"legacy123", salt=salt, n=16, r=8, p=1, dklen=32)
+    stored = "scrypt$16$8$1${}${}".format(
+        salt_b64, base64.urlsafe_b64encode(digest).decode("ascii")
+    )
+    assert auth.verify_password("legacy123", stored)
+    assert not auth.verify_password("legacy124", stored)
+    assert auth.password_needs_rehash(stored)
+
+
+def test_journal_mode_opt_out_applies_to_shared_db_file(monkeypatch, tmp_path) -> None:
+    db_path = str(tmp_path / "triage.db")
+    monkeypatch.setenv("TRIAGE_DB_PATH", db_path)
+    monkeypatch.setenv("TRIAGE_SQLITE_JOURNAL_MODE", "DELETE")
+    with TestClient(_app()) as client:
+        assert client.app.state.triage_service.repository.journal_mode == "DELETE"
+        assert client.app.state.auth_manager.journal_mode == "DELETE"
+        _login(client, username="admin", password="admin123")
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode;").fetchone()[0] == "delete"
+
+
+def test_seed_users_from_env_json(monkeypatch) -> None:
+    monkeypatch.setenv(
+        "TRIAGE_AUTH_USERS_JSON",
+        '[{"username": "lead", "password": "lead1234", "role": "Nurse"}, {"username": "x"}, 7]',
+    )
+    with _client(monkeypatch) as client:
+        login = _login(client, username="lead", password="lead1234")
+        assert login["user"]["role"] == "nurse"
+        missing = client.post(
+            "/api/v1/auth/login",
+            json={"username": "admin", "password": "admin123"},
         )
-        assert still_valid.status_code == 401
+        assert missing.status_code == 401
 
 
-def test_intake_and_dashboard_flow(tmp_path, monkeypatch) -> None:
-    with _client(tmp_path, monkeypatch) as client:
-        session = _complete_first_login(client, username="ops", password="ops123")
-        headers = {"Authorization": session["authorization"]}
-        intake = client.post(
-            "/api/v1/triage/intake",
-            json={
-                "phone": "5551234567",
-                "age": 30,
-                "sex": "Female",
-                "symptoms": "Cough and cold for two days",
-                "auto_book_high_urgency": True,
-                "always_route_when_model_requests_human": True,
-            },
-            headers=headers,
+def test_refresh_token_rotation_and_reuse_detection(client: TestClient) -> None:
+    session = _complete_first_login(client, username="admin", password="admin123")
+    first_refresh = session["refresh_token"]
+
+    rotated = client.post(
+        "/api/v1/auth/refresh",
+        json={"refresh_token": first_refresh},
+    )
+    assert rotated.status_code == 200
+    second_refresh = rotated.json()["refresh_token"]
+
+    reused = client.post(
+        "/api/v1/auth/refresh",
+        json={"refresh_token": first_refresh},
+    )
+    assert reused.status_code == 401
+
+    still_valid = client.post(
+        "/api/v1/auth/refresh",
+        json={"refresh_token": second_refresh},
+    )
+    assert still_valid.status_code == 401
+
+
+def test_tokens_missing_required_claims_are_rejected(monkeypatch) -> None:
+    monkeypatch.setenv("TRIAGE_AUTH_SECRET", "test-secret-key-with-enough-length!!")
+    with _client(monkeypatch) as client:
+        exp = int(time.time()) + 60
+        access = jwt.encode(
+            {"typ": "access", "sub": "admin", "exp": exp},
+            "test-secret-key-with-enough-length!!",
+            algorithm="HS256",
         )
-        assert intake.status_code == 200
-        body = intake.json()
-        assert body["triage_result"]["urgency"] in {"SOON", "ROUTINE", "URGENT", "EMERGENCY"}
-        assert body["routing_decision"]["action"] in {"AUTO_BOOK", "QUEUE_REVIEW", "ESCALATE"}
-
-        metrics = client.get("/api/v1/dashboard/metrics", headers=headers)
-        assert metrics.status_code == 200
-        metric_body = metrics.json()
-        assert metric_body["total_slots"] > 0
-        assert metric_body["available_slots"] >= 0
-        assert metric_body["booked_slots"] == (
-            metric_body["total_slots"] - metric_body["available_slots"]
+        me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {access}"})
+        assert me.status_code == 401
+
+        refresh = jwt.encode(
+            {"typ": "refresh", "sub": "admin", "jti": "abc", "exp": exp},
+            "test-secret-key-with-enough-length!!",
+            algorithm="HS256",
         )
-        assert 0 <= metric_body["slot_utilization_percent"] <= 100
-        assert metric_body["pending_high_priority_queue"] >= 0
-        assert metric_body["total_appointments"] >= 0
-        assert metric_body["auto_booked_appointments"] >= 0
-        assert metric_body["preempted_appointments"] >= 0
-        assert metric_body["triage_events_24h"] >= 1
-        assert metric_body["urgent_cases_24h"] >= 0
-        assert 0 <= metric_body["avg_confidence_24h"] <= 1
-
-
-def test_role_restrictions_and_audit_scope(tmp_path, monkeypatch) -> None:
-    with _client(tmp_path, monkeypatch) as client:
-        ops_session = _complete_first_login(client, username="ops", password="ops123")
-        nurse_session = _complete_first_login(client, username="nurse", password="nurse123")
-        ops_headers = {"Authorization": ops_session["authorization"]}
-        nurse_headers = {"Authorization": nurse_session["authorization"]}
-
-        queue_for_ops = client.get("/api/v1/queue", headers=ops_headers)
-        assert queue_for_ops.status_code == 403
-
-        queue_for_nurse = client.get("/api/v1/queue", headers=nurse_headers)
-        assert queue_for_nurse.status_code == 200
-
-        audit_for_ops = client.get("/api/v1/audit", headers=ops_headers)
-        assert audit_for_ops.status_code == 200
-        assert audit_for_ops.json()["role"] == "operations"
-
-
-def test_dashboard_appointments_phone_scope_by_role(tmp_path, monkeypatch) -> None:
-    with _client(tmp_path, monkeypatch) as client:
-        ops_session = _complete_first_login(client, username="ops", password="ops123")
-        admin_session = _complete_first_login(client, username="admin", password="admin123")
-        nurse_session = _complete_first_login(client, username="nurse", password="nurse123")
-        ops_headers = {"Authorization": ops_session["authorization"]}
-        admin_headers = {"Authorization": admin_session["authorization"]}
-        nurse_headers = {"Authorization": nurse_session["authorization"]}
-
-        intake = client.post(
-            "/api/v1/triage/intake",
-            json={
-                "phone": "5551234567",
-                "age": 31,
-                "sex": "Female",
-                "symptoms": "cold and fatigue for two days",
-                "auto_book_high_urgency": True,
-                "always_route_when_model_requests_human": True,
-            },
-            headers=ops_headers,
+        refreshed = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh})
+        assert refreshed.status_code == 401
+
+
+def test_intake_and_dashboard_flow(client: TestClient) -> None:
+    session = _complete_first_login(client, username="ops", password="ops123")
+    headers = {"Authorization": session["authorization"]}
+    intake = client.post("/api/v1/triage/intake", json=_INTAKE_REQUEST, headers=headers)
+    assert intake.status_code == 200
+    body = intake.json()
+    assert body["triage_result"]["urgency"] in {"SOON", "ROUTINE", "URGENT", "EMERGENCY"}
+    assert body["routing_decision"]["action"] in {"AUTO_BOOK", "QUEUE_REVIEW", "ESCALATE"}
+
+    metrics = client.get("/api/v1/dashboard/metrics", headers=headers)
+    assert metrics.status_code == 200
+    metric_body = metrics.json()
+    assert metric_body["total_slots"] > 0
+    assert metric_body["available_slots"] >= 0
+    assert metric_body["booked_slots"] == (
+        metric_body["total_slots"] - metric_body["available_slots"]
+    )
+    assert 0 <= metric_body["slot_utilization_percent"] <= 100
+    assert metric_body["pending_high_priority_queue"] >= 0
+    assert metric_body["total_appointments"] >= 0
+    assert metric_body["auto_booked_appointments"] >= 0
+    assert metric_body["preempted_appointments"] >= 0
+    assert metric_body["triage_events_24h"] >= 1
+    assert metric_body["urgent_cases_24h"] >= 0
+    assert 0 <= metric_body["avg_confidence_24h"] <= 1
+
+
+def test_role_restrictions_and_audit_scope(client: TestClient) -> None:
+    ops_session = _complete_first_login(client, username="ops", password="ops123")
+    nurse_session = _complete_first_login(client, username="nurse", password="nurse123")
+    ops_headers = {"Authorization": ops_session["authorization"]}
+    nurse_headers = {"Authorization": nurse_session["authorization"]}
+
+    queue_for_ops = client.get("/api/v1/queue", headers=ops_headers)
+    assert queue_for_ops.status_code == 403
+
+    queue_for_nurse = client.get("/api/v1/queue", headers=nurse_headers)
+    assert queue_for_nurse.status_code == 200
+
+    audit_for_ops = client.get("/api/v1/audit", headers=ops_headers)
+    assert audit_for_ops.status_code == 200
+    assert audit_for_ops.json()["role"] == "operations"
+
+
+@pytest.mark.anyio
+async def test_dashboard_appointments_phone_scope_by_role(client: TestClient) -> None:
+    ops_session = _complete_first_login(client, username="ops", password="ops123")
+    admin_session = _complete_first_login(client, username="admin", password="admin123")
+    nurse_session = _complete_first_login(client, username="nurse", password="nurse123")
+    ops_headers = {"Authorization": ops_session["authorization"]}
+    admin_headers = {"Authorization": admin_session["authorization"]}
+    nurse_headers = {"Authorization": nurse_session["authorization"]}
+
+    intake = client.post("/api/v1/triage/intake", json=_INTAKE_REQUEST, headers=ops_headers)
+    assert intake.status_code == 200
+
+    transport = httpx.ASGITransport(app=client.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as async_client:
+        ops_dashboard, admin_dashboard, nurse_dashboard = await asyncio.gather(
+            *(
+                async_client.get("/api/v1/dashboard/appointments", headers=headers)
+                for headers in (ops_headers, admin_headers, nurse_headers)
+            )
         )
-        assert intake.status_code == 200
 
-        ops_dashboard = client.get("/api/v1/dashboard/appointments", headers=ops_headers)
-        admin_dashboard = client.get("/api/v1/dashboard/appointments", headers=admin_headers)
-        nurse_dashboard = client.get("/api/v1/dashboard/appointments", headers=nurse_headers)
+    assert ops_dashboard.status_code == 200
+    assert admin_dashboard.status_code == 200
+    assert nurse_dashboard.status_code == 200
 
-        assert ops_dashboard.status_code == 200
-        assert admin_dashboard.status_code == 200
-        assert nurse_dashboard.status_code == 200
+    ops_items = ops_dashboard.json()["items"]
+    admin_items = admin_dashboard.json()["items"]
+    nurse_items = nurse_dashboard.json()["items"]
+    assert admin_items
+    assert ops_items
+    assert nurse_items
 
-        ops_items = ops_dashboard.json()["items"]
-        admin_items = admin_dashboard.json()["items"]
-        nurse_items = nurse_dashboard.json()["items"]
-        assert admin_items
-        assert ops_items
-        assert nurse_items
+    assert admin_items[0]["phone"] == "5551234567"
+    assert nurse_items[0]["phone"] == "***-***-4567"
+    assert ops_items[0]["phone"] == "-"
 
-        assert admin_items[0]["phone"] == "5551234567"
-        assert nurse_items[0]["phone"] == "***-***-4567"
-        assert ops_items[0]["phone"] == "-"
 
-
-def test_login_rate_limit_and_lockout(tmp_path, monkeypatch) -> None:
+def test_login_rate_limit_and_lockout(monkeypatch) -> None:
     monkeypatch.setenv("TRIAGE_AUTH_LOGIN_MAX_ATTEMPTS", "3")
     monkeypatch.setenv("TRIAGE_AUTH_LOGIN_WINDOW_SECONDS", "300")
     monkeypatch.setenv("TRIAGE_AUTH_LOGIN_LOCKOUT_SECONDS", "900")
     monkeypatch.setenv("TRIAGE_AUTH_TRUST_X_FORWARDED_FOR", "true")
 
-    with _client(tmp_path, monkeypatch) as client:
+    with _client(monkeypatch) as client:
         for _ in range(2):
             response = client.post(
                 "/api/v1/auth/login",
@@ -300,6 +580,13 @@ def test_login_rate_limit_and_lockout(tmp_path, monkeypatch) -> None:
         )
         assert still_locked.status_code == 429
 
+        proxied_locked = client.post(
+            "/api/v1/auth/login",
+            json={"username": "ops", "password": "ops123"},
+            headers={"x-forwarded-for": "10.10.10.10, 172.16.0.1"},
+        )
+        assert proxied_locked.status_code == 429
+
         other_ip_allowed = client.post(
             "/api/v1/auth/login",
             json={"username": "ops", "password": "ops123"},
@@ -308,13 +595,13 @@ def test_login_rate_limit_and_lockout(tmp_path, monkeypatch) -> None:
         assert other_ip_allowed.status_code == 200
 
 
-def test_login_ignores_x_forwarded_for_by_default(tmp_path, monkeypatch) -> None:
+def test_login_ignores_x_forwarded_for_by_default(monkeypatch) -> None:
     monkeypatch.setenv("TRIAGE_AUTH_LOGIN_MAX_ATTEMPTS", "3")
     monkeypatch.setenv("TRIAGE_AUTH_LOGIN_WINDOW_SECONDS", "300")
     monkeypatch.setenv("TRIAGE_AUTH_LOGIN_LOCKOUT_SECONDS", "900")
     monkeypatch.delenv("TRIAGE_AUTH_TRUST_X_FORWARDED_FOR", raising=False)
 
-    with _client(tmp_path, monkeypatch) as client:
+    with _client(monkeypatch) as client:
         for header_ip in ["10.10.10.10", "10.10.10.11"]:
             response = client.post(
                 "/api/v1/auth/login",
@@ -336,3 +623,93 @@ def test_login_ignores_x_forwarded_for_by_default(tmp_path, monkeypatch) -> None
             headers={"x-forwarded-for": "10.10.10.13"},
         )
         assert still_locked.status_code == 429
+
+
+def test_login_lockout_counts_buffered_failures(monkeypatch) -> None:
+    monkeypatch.setenv("TRIAGE_AUTH_LOGIN_MAX_ATTEMPTS", "6")
+    monkeypatch.setenv("TRIAGE_AUTH_LOGIN_WINDOW_SECONDS", "300")
+    monkeypatch.setenv("TRIAGE_AUTH_LOGIN_LOCKOUT_SECONDS", "900")
+
+    with _client(monkeypatch) as client:
+        for _ in range(5):
+            response = client.post(
+                "/api/v1/auth/login",
+                json={"username": "nurse", "password": "wrong-password"},
+            )
+            assert response.status_code == 401
+
+        locked = client.post(
+            "/api/v1/auth/login",
+            json={"username": "nurse", "password": "wrong-password"},
+        )
+        assert locked.status_code == 429
+
+        still_locked = client.post(
+            "/api/v1/auth/login",
+            json={"username": "nurse", "password": "nurse123"},
+        )
+        assert still_locked.status_code == 429
+
+
+def test_login_lockout_expires_after_lockout_window(monkeypatch) -> None:
+    monkeypatch.setenv("TRIAGE_AUTH_LOGIN_MAX_ATTEMPTS", "3")
+    monkeypatch.setenv("TRIAGE_AUTH_LOGIN_WINDOW_SECONDS", "300")
+    monkeypatch.setenv("TRIAGE_AUTH_LOGIN_LOCKOUT_SECONDS", "900")
+
+    with _client(monkeypatch) as client:
+        now = [time.time()]
+        client.app.state.auth_manager.clock = lambda: now[0]
+        for _ in range(3):
+            client.post(
+                "/api/v1/auth/login",
+                json={"username": "ops", "password": "wrong-password"},
+            )
+
+        locked = client.post(
+            "/api/v1/auth/login",
+            json={"username": "ops", "password": "ops123"},
+        )
+        assert locked.status_code == 429
+        assert locked.headers["Retry-After"] == "900"
+
+        now[0] += 200
+        still_locked = client.post(
+            "/api/v1/auth/login",
+            json={"username": "ops", "password": "ops123"},
+        )
+        assert still_locked.status_code == 429
+        assert still_locked.headers["Retry-After"] == "700"
+
+        now[0] += 701
+        _login(client, username="ops", password="ops123")
+
+
+def test_timer_flush_does_not_grow_connection_pool(monkeypatch) -> None:
+    monkeypatch.setenv("TRIAGE_AUTH_LOGIN_MAX_ATTEMPTS", "10")
+
+    with _client(monkeypatch) as client:
+        manager = client.app.state.auth_manager
+        manager.check_login_allowed("nurse", "10.0.0.0")
+        baseline = len(manager._connections)
+        for attempt in range(3):
+            manager.record_failed_login("nurse", f"10.0.0.{attempt}")
+            flusher = threading.Thread(target=manager._flush_login_failures_on_timer)
+            flusher.start()
+            flusher.join()
+            assert not manager._failure_buffer
+        assert len(manager._connections) == baseline
+        allowed, _ = manager.check_login_allowed("nurse", "10.0.0.0")
+        assert allowed
+
+
+def test_unknown_user_login_reuses_prebuilt_dummy_hash(client: TestClient, monkeypatch) -> None:
+    def fail_hash(password: str, *, salt: bytes | None = None) -> str:
+        raise AssertionError("dummy hash must be built before the first login")
+
+    monkeypatch.setattr(auth, "hash_password", fail_hash)
+    for _ in range(2):
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"username": "nobody", "password": "nobody123"},
+        )
+        assert response.status_code == 401
@@ -1,5 +1,7 @@
 import json
 
+import pytest
+
 import triage_agent.reasoner_factory as reasoner_factory
 from triage_agent.config import TriageConfig
 from triage_agent.gemini_reasoner import GeminiTriageReasoner
@@ -7,8 +9,8 @@ from triage_agent.llm_reasoner import HybridTriageReasoner
 from triage_agent.models import Urgency
 
 
-def _payload_json() -> str:
-    payload = {
+_PAYLOAD_JSON = json.dumps(
+    {
         "urgency": "SOON",
         "confidence": 0.83,
         "red_flags": [],
@@ -21,7 +23,8 @@ def _payload_json() -> str:
         "recommended_timeframe_minutes": 720,
         "human_routing_flag": False,
     }
-    return json.dumps(payload)
+)
+_FENCED_PAYLOAD_JSON = f"```json\n{_PAYLOAD_JSON}\n```"
 
 
 class _GeminiResponse:
@@ -50,20 +53,20 @@ class _StubGeminiReasoner:
         raise NotImplementedError
 
 
-def test_gemini_reasoner_parses_json_response() -> None:
-    reasoner = GeminiTriageReasoner(client=_GeminiClient(_payload_json()))
+@pytest.mark.parametrize(
+    "raw_output",
+    [
+        pytest.param(_PAYLOAD_JSON, id="plain"),
+        pytest.param(_FENCED_PAYLOAD_JSON, id="fenced"),
+    ],
+)
+def test_gemini_reasoner_parses_json_response(raw_output: str) -> None:
+    reasoner = GeminiTriageReasoner(client=_GeminiClient(raw_output))
     result = reasoner.analyze(age=22, sex="Female", symptoms="Mild rash for two days")
     assert result.urgency == Urgency.SOON
     assert result.suggested_department == "General Medicine"
-    assert result.human_routing_flag is False
-
-
-def test_gemini_reasoner_parses_fenced_json() -> None:
-    fenced = f"```json\n{_payload_json()}\n```"
-    reasoner = GeminiTriageReasoner(client=_GeminiClient(fenced))
-    result = reasoner.analyze(age=30, sex="Male", symptoms="Dry skin and mild irritation")
-    assert result.urgency == Urgency.SOON
     assert result.recommended_timeframe_minutes == 720
+    assert result.human_routing_flag is False
 
 
 def test_factory_builds_gemini_reasoner(monkeypatch) -> None:
@@ -1,5 +1,7 @@
 import json
 
+import pytest
+
 from triage_agent.llm_reasoner import (
     HybridTriageReasoner,
     LLMTriagePayload,
@@ -9,6 +11,23 @@ from triage_agent.models import Urgency
 from triage_agent.reasoner import HeuristicTriageReasoner
 
 
+_URGENT_PAYLOAD_JSON = json.dumps(
+    {
+        "urgency": "URGENT",
+        "confidence": 0.87,
+        "red_flags": ["Respiratory compromise risk"],
+        "department_candidates": [
+            {"department": "Pulmonology", "score": 0.9},
+            {"department": "General Medicine", "score": 0.1},
+        ],
+        "suggested_department": "Pulmonology",
+        "rationale": "Breathing symptoms with red-flag concern.",
+        "recommended_timeframe_minutes": 90,
+        "human_routing_flag": True,
+    }
+)
+
+
 class _ResponseEnvelope:
     def __init__(self, parsed=None, output_text: str = ""):
         self.output_parsed = parsed
@@ -38,20 +57,7 @@ class _ResponsesAPIFallback:
         raise RuntimeError("parse unavailable")
 
     def create(self, **kwargs):
-        payload = {
-            "urgency": "URGENT",
-            "confidence": 0.87,
-            "red_flags": ["Respiratory compromise risk"],
-            "department_candidates": [
-                {"department": "Pulmonology", "score": 0.9},
-                {"department": "General Medicine", "score": 0.1},
-            ],
-            "suggested_department": "Pulmonology",
-            "rationale": "Breathing symptoms with red-flag concern.",
-            "recommended_timeframe_minutes": 90,
-            "human_routing_flag": True,
-        }
-        return _ResponseEnvelope(output_text=json.dumps(payload))
+        return _ResponseEnvelope(output_text=_URGENT_PAYLOAD_JSON)
 
 
 class _ClientParseOK:
@@ -69,24 +75,23 @@ class _FailingReasoner:
         raise RuntimeError("LLM outage")
 
 
-def test_openai_reasoner_uses_parse_path() -> None:
-    reasoner = OpenAITriageReasoner(client=_ClientParseOK())
-    result = reasoner.analyze(age=28, sex="Female", symptoms="Cough and mild fever")
-    assert result.urgency == Urgency.SOON
-    assert result.suggested_department == "General Medicine"
-    assert result.human_routing_flag is False
-
-
-def test_openai_reasoner_falls_back_to_json_schema_create() -> None:
-    reasoner = OpenAITriageReasoner(client=_ClientFallback())
+@pytest.mark.parametrize(
+    ("client_factory", "urgency", "department", "human_flag"),
+    [
+        pytest.param(_ClientParseOK, Urgency.SOON, "General Medicine", False, id="parse-path"),
+        pytest.param(_ClientFallback, Urgency.URGENT, "Pulmonology", True, id="fallback-path"),
+    ],
+)
+def test_openai_reasoner_response_paths(client_factory, urgency, department, human_flag) -> None:
+    reasoner = OpenAITriageReasoner(client=client_factory())
     result = reasoner.analyze(
         age=61,
         sex="Male",
         symptoms="Breathing feels heavy and shortness of breath",
     )
-    assert result.urgency == Urgency.URGENT
-    assert result.suggested_department == "Pulmonology"
-    assert result.human_routing_flag is True
+    assert result.urgency == urgency
+    assert result.suggested_department == department
+    assert result.human_routing_flag is human_flag
 
 
 def test_hybrid_reasoner_uses_safe_fallback() -> None:
@@ -1,8 +1,30 @@
+from dataclasses import replace
+
+import pytest
+
 from triage_agent.config import TriageConfig
 from triage_agent.models import DepartmentScore, RoutingAction, TriageResult, Urgency
 from triage_agent.policy import RoutingPolicy
 
 
+_TEMPLATE = TriageResult(
+    redacted_symptoms="cough",
+    urgency=Urgency.SOON,
+    confidence=0.90,
+    red_flags=[],
+    department_candidates=[DepartmentScore("General Medicine", 0.90)],
+    suggested_department="General Medicine",
+    rationale="test",
+    recommended_timeframe_minutes=60,
+    human_routing_flag=False,
+)
+
+
+@pytest.fixture(scope="module")
+def policy() -> RoutingPolicy:
+    return RoutingPolicy(TriageConfig())
+
+
 def _triage_result(
     *,
     urgency: Urgency = Urgency.SOON,
@@ -10,33 +32,26 @@ def _triage_result(
     dept_score: float = 0.90,
     human_flag: bool = False,
 ) -> TriageResult:
-    return TriageResult(
-        redacted_symptoms="cough",
+    return replace(
+        _TEMPLATE,
         urgency=urgency,
         confidence=confidence,
-        red_flags=[],
         department_candidates=[DepartmentScore("General Medicine", dept_score)],
-        suggested_department="General Medicine",
-        rationale="test",
-        recommended_timeframe_minutes=60,
         human_routing_flag=human_flag,
     )
 
 
-def test_policy_auto_books_when_all_thresholds_met() -> None:
-    policy = RoutingPolicy(TriageConfig())
+def test_policy_auto_books_when_all_thresholds_met(policy: RoutingPolicy) -> None:
     decision = policy.decide(_triage_result())
     assert decision.action == RoutingAction.AUTO_BOOK
 
 
-def test_policy_routes_queue_when_confidence_low() -> None:
-    policy = RoutingPolicy(TriageConfig())
+def test_policy_routes_queue_when_confidence_low(policy: RoutingPolicy) -> None:
     decision = policy.decide(_triage_result(confidence=0.60, urgency=Urgency.SOON))
     assert decision.action == RoutingAction.QUEUE_REVIEW
 
 
-def test_policy_escalates_emergency_when_human_routing_required() -> None:
-    policy = RoutingPolicy(TriageConfig())
+def test_policy_escalates_emergency_when_human_routing_required(policy: RoutingPolicy) -> None:
     decision = policy.decide(
         _triage_result(urgency=Urgency.EMERGENCY, confidence=0.95, human_flag=True)
     )
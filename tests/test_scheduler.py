@@ -1,55 +1,52 @@
+import sqlite3
+from dataclasses import replace
 from datetime import timedelta
 
+import pytest
+
 from triage_agent.config import TriageConfig
-from triage_agent.database import SQLiteRepository, utc_now
+from triage_agent.database import SQLiteRepository, parse_db_time, to_db_time, utc_now
 from triage_agent.models import Urgency
 from triage_agent.scheduler import Scheduler
 
-
-def _setup_repo(tmp_path):
-    db_file = tmp_path / "triage_test.db"
-    repo = SQLiteRepository(str(db_file))
-    repo.init_db()
-    return repo
+_INSERT_TRIAGE_EVENT = """
+    INSERT INTO triage_events (
+        patient_id,
+        redacted_symptoms,
+        urgency,
+        confidence,
+        red_flags,
+        department_candidates,
+        suggested_department,
+        rationale,
+        recommended_timeframe_minutes,
+        human_routing_flag
+    ) VALUES (?, ?, ?, 0.9, '[]', '[]', ?, 'test', ?, 0);
+"""
 
 
-def _seed_patient_and_triage(repo: SQLiteRepository):
-    with repo.connect() as conn:
-        conn.execute("BEGIN IMMEDIATE;")
-        patient_id = repo.create_patient(
-            phone=None,
-            age=30,
-            sex="Other",
-            symptoms="test symptoms",
-            conn=conn,
-        )
-        triage_event_id = conn.execute(
-            """
-            INSERT INTO triage_events (
-                patient_id,
-                redacted_symptoms,
-                urgency,
-                confidence,
-                red_flags,
-                department_candidates,
-                suggested_department,
-                rationale,
-                recommended_timeframe_minutes,
-                human_routing_flag
-            ) VALUES (?, 'test symptoms', 'SOON', 0.9, '[]', '[]', 'General Medicine', 'test', 60, 0);
-            """,
-            (patient_id,),
-        ).lastrowid
-        return int(patient_id), int(triage_event_id)
+def _insert_patient_and_triage(repo: SQLiteRepository, conn: sqlite3.Connection):
+    patient_id = repo.create_patient(
+        phone=None,
+        age=30,
+        sex="Other",
+        symptoms="test symptoms",
+        conn=conn,
+    )
+    triage_event_id = conn.execute(
+        _INSERT_TRIAGE_EVENT,
+        (patient_id, "test symptoms", "SOON", "General Medicine", 60),
+    ).lastrowid
+    return int(patient_id), int(triage_event_id)
 
 
-def test_scheduler_books_available_slot(tmp_path) -> None:
-    repo = _setup_repo(tmp_path)
-    config = TriageConfig(db_path=str(tmp_path / "triage_test.db"))
+def test_scheduler_books_available_slot(repo: SQLiteRepository) -> None:
+    config = TriageConfig(db_path=repo.db_path)
     scheduler = Scheduler(repository=repo, config=config)
 
     now = utc_now()
     with repo.connect() as conn:
+        conn.execute("BEGIN IMMEDIATE;")
         repo.create_slot(
             department="General Medicine",
             provider="Dr. Test",
@@ -57,8 +54,8 @@ def test_scheduler_books_available_slot(tmp_path) -> None:
             end_at=now + timedelta(hours=3),
             conn=conn,
         )
+        patient_id, triage_event_id = _insert_patient_and_triage(repo, conn)
 
-    patient_id, triage_event_id = _seed_patient_and_triage(repo)
     result = scheduler.book(
         patient_id=patient_id,
         triage_event_id=triage_event_id,
@@ -70,9 +67,8 @@ def test_scheduler_books_available_slot(tmp_path) -> None:
     assert result.appointment_id is not None
 
 
-def test_scheduler_preempts_lower_priority_case(tmp_path) -> None:
-    repo = _setup_repo(tmp_path)
-    config = TriageConfig(db_path=str(tmp_path / "triage_test.db"))
+def test_scheduler_preempts_lower_priority_case(repo: SQLiteRepository) -> None:
+    config = TriageConfig(db_path=repo.db_path)
     scheduler = Scheduler(repository=repo, config=config)
     now = utc_now()
 
@@ -86,21 +82,8 @@ def test_scheduler_preempts_lower_priority_case(tmp_path) -> None:
             conn=conn,
         )
         low_triage_event = conn.execute(
-            """
-            INSERT INTO triage_events (
-                patient_id,
-                redacted_symptoms,
-                urgency,
-                confidence,
-                red_flags,
-                department_candidates,
-                suggested_department,
-                rationale,
-                recommended_timeframe_minutes,
-                human_routing_flag
-            ) VALUES (?, 'routine follow up', 'ROUTINE', 0.9, '[]', '[]', 'Cardiology', 'test', 120, 0);
-            """,
-            (low_patient,),
+            _INSERT_TRIAGE_EVENT,
+            (low_patient, "routine follow up", "ROUTINE", "Cardiology", 120),
         ).lastrowid
 
         preemptable_slot = repo.create_slot(
@@ -128,8 +111,8 @@ def test_scheduler_preempts_lower_priority_case(tmp_path) -> None:
             end_at=now + timedelta(days=3, hours=1),
             conn=conn,
         )
+        high_patient, high_triage_event = _insert_patient_and_triage(repo, conn)
 
-    high_patient, high_triage_event = _seed_patient_and_triage(repo)
     result = scheduler.book(
         patient_id=high_patient,
         triage_event_id=high_triage_event,
@@ -140,3 +123,104 @@ def test_scheduler_preempts_lower_priority_case(tmp_path) -> None:
     )
     assert result.status == "PREEMPTED"
     assert result.preempted_appointment_id is not None
+
+
+def test_window_for_follows_overridden_urgency_windows():
+    config = replace(
+        TriageConfig(),
+        urgency_windows_minutes={**TriageConfig().urgency_windows_minutes, "SOON": 15},
+    )
+    assert config.window_for(Urgency.SOON) == 15
+    assert config.window_for(Urgency.EMERGENCY) == 60 * 4
+
+
+def test_connect_reuses_thread_connection_outside_transactions(repo: SQLiteRepository) -> None:
+    with repo.connect() as conn:
+        with repo.connect() as again:
+            assert again is conn
+        conn.execute("BEGIN IMMEDIATE;")
+        with repo.connect() as nested:
+            assert nested is not conn
+        with pytest.raises(sqlite3.ProgrammingError):
+            nested.execute("SELECT 1;")
+        conn.rollback()
+    with repo.connect() as after:
+        assert after is conn
+
+
+def test_close_releases_pooled_connections(repo: SQLiteRepository) -> None:
+    with repo.connect() as conn:
+        pass
+    reader = repo.read_connect()
+    repo.data_version()
+    watcher = repo._watch_conn
+    repo.close()
+    assert repo._watch_conn is None
+    for closed in (conn, reader, watcher):
+        with pytest.raises(sqlite3.ProgrammingError):
+            closed.execute("SELECT 1;")
+    with repo.connect() as reopened:
+        assert reopened is not conn
+        assert reopened.execute("SELECT COUNT(*) FROM slots;").fetchone()[0] >= 0
+    assert isinstance(repo.data_version(), int)
+
+
+def test_read_connect_is_query_only(repo: SQLiteRepository) -> None:
+    conn = repo.read_connect()
+    with repo.connect() as writer:
+        assert conn is not writer
+    assert conn.execute("SELECT COUNT(*) FROM slots;").fetchone()[0] >= 0
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM slots;")
+
+
+def test_init_db_reports_effective_journal_mode(tmp_path) -> None:
+    file_repo = SQLiteRepository(str(tmp_path / "triage.db"))
+    file_repo.init_db()
+    assert file_repo.journal_mode == "WAL"
+
+    memory_repo = SQLiteRepository(":memory:")
+    memory_repo.init_db()
+    assert memory_repo.journal_mode == "MEMORY"
+
+
+def test_create_appointment_rejects_booked_slot_without_writing(repo: SQLiteRepository) -> None:
+    now = utc_now()
+    with repo.connect() as conn:
+        conn.execute("BEGIN IMMEDIATE;")
+        slot_id = repo.create_slot(
+            department="General Medicine",
+            provider="Dr. Test",
+            start_at=now + timedelta(hours=2),
+            end_at=now + timedelta(hours=3),
+            conn=conn,
+        )
+        patient_id, triage_event_id = _insert_patient_and_triage(repo, conn)
+
+    booking = dict(
+        patient_id=patient_id,
+        triage_event_id=triage_event_id,
+        urgency="SOON",
+        department="General Medicine",
+        provider="Dr. Test",
+        slot_id=slot_id,
+        note="test book",
+    )
+    appointment_id = repo.create_appointment(**booking)
+    assert repo.get_slot(slot_id)["appointment_id"] == appointment_id
+
+    with pytest.raises(RuntimeError):
+        repo.create_appointment(**booking)
+    with repo.connect() as conn:
+        count = conn.execute(
+            "SELECT COUNT(*) FROM appointments WHERE slot_id = ?;", (slot_id,)
+        ).fetchone()[0]
+    assert count == 1
+
+
+def test_db_time_round_trips_sqlite_datetime_text(repo: SQLiteRepository) -> None:
+    with repo.read_connect() as conn:
+        sqlite_now = conn.execute("SELECT datetime('now');").fetchone()[0]
+    parsed = parse_db_time(sqlite_now)
+    assert to_db_time(parsed) == sqlite_now
+    assert len(to_db_time(utc_now())) == len(sqlite_now)
@@ -1,3 +1,5 @@
+from collections import deque
+
 from triage_agent.config import TriageConfig
 from triage_agent.database import SQLiteRepository
 from triage_agent.models import RoutingAction
@@ -10,20 +12,18 @@ from triage_agent.service import TriageService
 
 class _SpyNotifier:
     label = "spy"
+    _deliveries = (NotificationDelivery(channel="spy", status="SENT", detail="ok"),)
 
     def __init__(self) -> None:
-        self.events = []
+        self.events = deque()
 
     def dispatch(self, event):
         self.events.append(event)
-        return [NotificationDelivery(channel="spy", status="SENT", detail="ok")]
+        return list(self._deliveries)
 
 
-def _build_service(tmp_path, notifier) -> TriageService:
-    db_path = str(tmp_path / "service_alerts.db")
-    config = TriageConfig(db_path=db_path)
-    repo = SQLiteRepository(config.db_path)
-    repo.init_db()
+def _build_service(repo: SQLiteRepository, notifier) -> TriageService:
+    config = TriageConfig(db_path=repo.db_path)
     return TriageService(
         repository=repo,
         reasoner=HeuristicTriageReasoner(),
@@ -36,9 +36,9 @@ def _build_service(tmp_path, notifier) -> TriageService:
     )
 
 
-def test_service_dispatches_notification_on_emergency_escalation(tmp_path) -> None:
+def test_service_dispatches_notification_on_emergency_escalation(repo: SQLiteRepository) -> None:
     notifier = _SpyNotifier()
-    service = _build_service(tmp_path, notifier)
+    service = _build_service(repo, notifier)
     outcome = service.process_intake(
         phone="555-111-2222",
         age=58,
@@ -57,9 +57,9 @@ def test_service_dispatches_notification_on_emergency_escalation(tmp_path) -> No
     assert "NOTIFICATION_DISPATCHED" in actions
 
 
-def test_audit_views_are_role_scoped(tmp_path) -> None:
+def test_audit_views_are_role_scoped(repo: SQLiteRepository) -> None:
     notifier = _SpyNotifier()
-    service = _build_service(tmp_path, notifier)
+    service = _build_service(repo, notifier)
     service.process_intake(
         phone="5551239876",
         age=26,
@@ -81,3 +81,23 @@ def test_audit_views_are_role_scoped(tmp_path) -> None:
 
     admin = service.get_audit_view(role="admin", limit=20)
     assert admin["triage"][0]["phone"] == "5551239876"
+
+
+def test_audit_view_cache_is_invalidated_by_new_writes(repo: SQLiteRepository) -> None:
+    service = _build_service(repo, _SpyNotifier())
+    intake = {
+        "phone": None,
+        "age": 26,
+        "sex": "Female",
+        "symptoms": "Cough and cold for two days",
+        "auto_book_high_urgency": True,
+        "always_route_when_model_requests_human": True,
+    }
+    service.process_intake(**intake)
+
+    first = service.get_audit_view(role="admin", limit=20)
+    assert service.get_audit_view(role="admin", limit=20) is first
+
+    service.process_intake(**intake)
+    refreshed = service.get_audit_view(role="admin", limit=20)
+    assert len(refreshed["triage"]) == len(first["triage"]) + 1
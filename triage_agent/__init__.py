@@ -1,27 +1,49 @@
-from .config import TriageConfig
-from .database import SQLiteRepository
-from .gemini_reasoner import GeminiTriageReasoner
-from .notification_factory import build_notifier
-from .notifications import HookNotificationDispatcher, NoopNotificationDispatcher
-from .llm_reasoner import HybridTriageReasoner, OpenAITriageReasoner
-from .policy import RoutingPolicy
-from .reasoner_factory import build_reasoner
-from .reasoner import HeuristicTriageReasoner
-from .scheduler import Scheduler
-from .service import TriageService
-
-__all__ = [
-    "HeuristicTriageReasoner",
-    "OpenAITriageReasoner",
-    "GeminiTriageReasoner",
-    "HybridTriageReasoner",
-    "build_reasoner",
-    "build_notifier",
-    "NoopNotificationDispatcher",
-    "HookNotificationDispatcher",
-    "RoutingPolicy",
-    "SQLiteRepository",
-    "Scheduler",
-    "TriageConfig",
-    "TriageService",
-]
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .config import TriageConfig
+    from .database import SQLiteRepository
+    from .gemini_reasoner import GeminiTriageReasoner
+    from .notification_factory import build_notifier
+    from .notifications import HookNotificationDispatcher, NoopNotificationDispatcher
+    from .llm_reasoner import HybridTriageReasoner, OpenAITriageReasoner
+    from .policy import RoutingPolicy
+    from .reasoner_factory import build_reasoner
+    from .reasoner import HeuristicTriageReasoner
+    from .scheduler import Scheduler
+    from .service import TriageService
+
+_LAZY = {
+    "HeuristicTriageReasoner": ".reasoner",
+    "OpenAITriageReasoner": ".llm_reasoner",
+    "GeminiTriageReasoner": ".gemini_reasoner",
+    "HybridTriageReasoner": ".llm_reasoner",
+    "build_reasoner": ".reasoner_factory",
+    "build_notifier": ".notification_factory",
+    "NoopNotificationDispatcher": ".notifications",
+    "HookNotificationDispatcher": ".notifications",
+    "RoutingPolicy": ".policy",
+    "SQLiteRepository": ".database",
+    "Scheduler": ".scheduler",
+    "TriageConfig": ".config",
+    "TriageService": ".service",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
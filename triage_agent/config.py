@@ -1,14 +1,20 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Mapping
+
+from .models import Urgency
+
+_TRUTHY = frozenset({"1", "true", "yes", "y", "on"})
 
 
 def _env_bool(name: str, default: bool) -> bool:
     raw = os.getenv(name)
     if raw is None:
         return default
-    return raw.strip().lower() in {"1", "true", "yes", "y", "on"}
+    return raw.strip().lower() in _TRUTHY
 
 
 def _env_float(name: str, default: float) -> float:
@@ -39,16 +45,40 @@ def _env_str(name: str, default: str) -> str:
     return value if value else default
 
 
-def _env_csv(name: str, default: list[str] | None = None) -> list[str]:
+def _env_csv(name: str, default: tuple[str, ...] = ()) -> tuple[str, ...]:
     raw = os.getenv(name)
     if raw is None:
-        return list(default or [])
-    return [item.strip() for item in raw.split(",") if item.strip()]
+        return tuple(default)
+    return tuple(filter(None, map(str.strip, raw.split(","))))
+
+
+_DEFAULT_URGENCY_WINDOWS_MINUTES: Mapping[str, int] = MappingProxyType(
+    {
+        "EMERGENCY": 60 * 4,
+        "URGENT": 60 * 48,
+        "SOON": 60 * 24 * 7,
+        "ROUTINE": 60 * 24 * 28,
+    }
+)
+_DEFAULT_DEPARTMENT_PROVIDERS: Mapping[str, tuple[str, ...]] = MappingProxyType(
+    {
+        "General Medicine": ("Dr. Patel", "Dr. Reed"),
+        "Cardiology": ("Dr. Shah", "Dr. Park"),
+        "Pulmonology": ("Dr. Khan", "Dr. Evans"),
+        "Neurology": ("Dr. Li", "Dr. Garcia"),
+        "Orthopedics": ("Dr. Smith", "Dr. Rao"),
+        "Dermatology": ("Dr. Kim",),
+        "Gastroenterology": ("Dr. Brown",),
+    }
+)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TriageConfig:
     db_path: str = field(default_factory=lambda: os.getenv("TRIAGE_DB_PATH", "triage.db"))
+    sqlite_journal_mode: str = field(
+        default_factory=lambda: os.getenv("TRIAGE_SQLITE_JOURNAL_MODE", "WAL")
+    )
     reasoner_mode: str = field(default_factory=lambda: os.getenv("TRIAGE_REASONER_MODE", "hybrid"))
     openai_model: str = field(default_factory=lambda: os.getenv("TRIAGE_OPENAI_MODEL", "gpt-4o-mini"))
     openai_api_key: str = field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
@@ -62,12 +92,12 @@ class TriageConfig:
     gemini_max_output_tokens: int = 500
     gemini_thinking_level: str = "HIGH"
     notifications_enabled: bool = True
-    notify_on_urgencies: list[str] = field(default_factory=lambda: ["EMERGENCY", "URGENT"])
+    notify_on_urgencies: tuple[str, ...] = ("EMERGENCY", "URGENT")
     notification_webhook_url: str = field(default_factory=lambda: os.getenv("TRIAGE_NOTIFICATION_WEBHOOK_URL", ""))
     notification_email_webhook_url: str = field(default_factory=lambda: os.getenv("TRIAGE_EMAIL_WEBHOOK_URL", ""))
     notification_sms_webhook_url: str = field(default_factory=lambda: os.getenv("TRIAGE_SMS_WEBHOOK_URL", ""))
-    notification_email_to: list[str] = field(default_factory=list)
-    notification_sms_to: list[str] = field(default_factory=list)
+    notification_email_to: tuple[str, ...] = ()
+    notification_sms_to: tuple[str, ...] = ()
     notification_timeout_seconds: float = 6.0
     notification_fail_open: bool = True
     auto_book_confidence_threshold: float = 0.80
@@ -77,111 +107,129 @@ class TriageConfig:
     preemption_enabled: bool = True
     fallback_window_minutes: int = 60 * 24 * 90
     seed_days: int = 30
-    urgency_windows_minutes: dict[str, int] = field(
-        default_factory=lambda: {
-            "EMERGENCY": 60 * 4,
-            "URGENT": 60 * 48,
-            "SOON": 60 * 24 * 7,
-            "ROUTINE": 60 * 24 * 28,
-        }
+    audit_cache_ttl_seconds: float = 5.0
+    audit_cache_max_entries: int = 32
+    urgency_windows_minutes: Mapping[str, int] = field(
+        default_factory=lambda: _DEFAULT_URGENCY_WINDOWS_MINUTES
     )
-    department_providers: dict[str, list[str]] = field(
-        default_factory=lambda: {
-            "General Medicine": ["Dr. Patel", "Dr. Reed"],
-            "Cardiology": ["Dr. Shah", "Dr. Park"],
-            "Pulmonology": ["Dr. Khan", "Dr. Evans"],
-            "Neurology": ["Dr. Li", "Dr. Garcia"],
-            "Orthopedics": ["Dr. Smith", "Dr. Rao"],
-            "Dermatology": ["Dr. Kim"],
-            "Gastroenterology": ["Dr. Brown"],
-        }
+    department_providers: Mapping[str, tuple[str, ...]] = field(
+        default_factory=lambda: _DEFAULT_DEPARTMENT_PROVIDERS
     )
+    _urgency_windows: dict[Urgency, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self,
+            "_urgency_windows",
+            {
+                urgency: self.urgency_windows_minutes[urgency.value]
+                for urgency in Urgency
+                if urgency.value in self.urgency_windows_minutes
+            },
+        )
+
+    def window_for(self, urgency: Urgency) -> int:
+        return self._urgency_windows[urgency]
 
     @classmethod
     def from_env(cls) -> "TriageConfig":
         cfg = cls()
-        cfg.reasoner_mode = _env_str("TRIAGE_REASONER_MODE", cfg.reasoner_mode).lower()
-        cfg.openai_model = _env_str("TRIAGE_OPENAI_MODEL", cfg.openai_model)
-        cfg.openai_api_key = _env_str("OPENAI_API_KEY", cfg.openai_api_key)
-        cfg.openai_timeout_seconds = _env_float(
-            "TRIAGE_OPENAI_TIMEOUT_SECONDS",
-            cfg.openai_timeout_seconds,
-        )
-        cfg.openai_max_output_tokens = _env_int(
-            "TRIAGE_OPENAI_MAX_OUTPUT_TOKENS",
-            cfg.openai_max_output_tokens,
-        )
-        cfg.gemini_model = _env_str("TRIAGE_GEMINI_MODEL", cfg.gemini_model)
-        cfg.gemini_api_key = _env_str("GEMINI_API_KEY", cfg.gemini_api_key)
-        cfg.gemini_timeout_seconds = _env_float(
-            "TRIAGE_GEMINI_TIMEOUT_SECONDS",
-            cfg.gemini_timeout_seconds,
-        )
-        cfg.gemini_max_output_tokens = _env_int(
-            "TRIAGE_GEMINI_MAX_OUTPUT_TOKENS",
-            cfg.gemini_max_output_tokens,
-        )
-        cfg.gemini_thinking_level = _env_str(
-            "TRIAGE_GEMINI_THINKING_LEVEL",
-            cfg.gemini_thinking_level,
-        ).upper()
-        cfg.notifications_enabled = _env_bool(
-            "TRIAGE_NOTIFICATIONS_ENABLED",
-            cfg.notifications_enabled,
-        )
-        cfg.notify_on_urgencies = _env_csv(
-            "TRIAGE_NOTIFY_ON_URGENCIES",
-            cfg.notify_on_urgencies,
-        ) or ["EMERGENCY", "URGENT"]
-        cfg.notification_webhook_url = _env_str(
-            "TRIAGE_NOTIFICATION_WEBHOOK_URL",
-            cfg.notification_webhook_url,
-        )
-        cfg.notification_email_webhook_url = _env_str(
-            "TRIAGE_EMAIL_WEBHOOK_URL",
-            cfg.notification_email_webhook_url,
-        )
-        cfg.notification_sms_webhook_url = _env_str(
-            "TRIAGE_SMS_WEBHOOK_URL",
-            cfg.notification_sms_webhook_url,
-        )
-        cfg.notification_email_to = _env_csv(
-            "TRIAGE_NOTIFICATION_EMAIL_TO",
-            cfg.notification_email_to,
-        )
-        cfg.notification_sms_to = _env_csv(
-            "TRIAGE_NOTIFICATION_SMS_TO",
-            cfg.notification_sms_to,
-        )
-        cfg.notification_timeout_seconds = _env_float(
-            "TRIAGE_NOTIFICATION_TIMEOUT_SECONDS",
-            cfg.notification_timeout_seconds,
-        )
-        cfg.notification_fail_open = _env_bool(
-            "TRIAGE_NOTIFICATION_FAIL_OPEN",
-            cfg.notification_fail_open,
-        )
-        cfg.auto_book_confidence_threshold = _env_float(
-            "TRIAGE_CONFIDENCE_THRESHOLD", cfg.auto_book_confidence_threshold
-        )
-        cfg.department_score_threshold = _env_float(
-            "TRIAGE_DEPARTMENT_THRESHOLD", cfg.department_score_threshold
-        )
-        cfg.always_route_when_model_requests_human = _env_bool(
-            "TRIAGE_ALWAYS_ROUTE_MODEL_HUMAN",
-            cfg.always_route_when_model_requests_human,
-        )
-        cfg.auto_book_high_urgency = _env_bool(
-            "TRIAGE_AUTO_BOOK_HIGH_URGENCY",
-            cfg.auto_book_high_urgency,
-        )
-        cfg.preemption_enabled = _env_bool(
-            "TRIAGE_PREEMPTION_ENABLED",
-            cfg.preemption_enabled,
-        )
-        cfg.fallback_window_minutes = _env_int(
-            "TRIAGE_FALLBACK_WINDOW_MINUTES",
-            cfg.fallback_window_minutes,
+        return replace(
+            cfg,
+            sqlite_journal_mode=_env_str(
+                "TRIAGE_SQLITE_JOURNAL_MODE",
+                cfg.sqlite_journal_mode,
+            ).upper(),
+            reasoner_mode=_env_str("TRIAGE_REASONER_MODE", cfg.reasoner_mode).lower(),
+            openai_model=_env_str("TRIAGE_OPENAI_MODEL", cfg.openai_model),
+            openai_api_key=_env_str("OPENAI_API_KEY", cfg.openai_api_key),
+            openai_timeout_seconds=_env_float(
+                "TRIAGE_OPENAI_TIMEOUT_SECONDS",
+                cfg.openai_timeout_seconds,
+            ),
+            openai_max_output_tokens=_env_int(
+                "TRIAGE_OPENAI_MAX_OUTPUT_TOKENS",
+                cfg.openai_max_output_tokens,
+            ),
+            gemini_model=_env_str("TRIAGE_GEMINI_MODEL", cfg.gemini_model),
+            gemini_api_key=_env_str("GEMINI_API_KEY", cfg.gemini_api_key),
+            gemini_timeout_seconds=_env_float(
+                "TRIAGE_GEMINI_TIMEOUT_SECONDS",
+                cfg.gemini_timeout_seconds,
+            ),
+            gemini_max_output_tokens=_env_int(
+                "TRIAGE_GEMINI_MAX_OUTPUT_TOKENS",
+                cfg.gemini_max_output_tokens,
+            ),
+            gemini_thinking_level=_env_str(
+                "TRIAGE_GEMINI_THINKING_LEVEL",
+                cfg.gemini_thinking_level,
+            ).upper(),
+            notifications_enabled=_env_bool(
+                "TRIAGE_NOTIFICATIONS_ENABLED",
+                cfg.notifications_enabled,
+            ),
+            notify_on_urgencies=_env_csv(
+                "TRIAGE_NOTIFY_ON_URGENCIES",
+                cfg.notify_on_urgencies,
+            ) or ("EMERGENCY", "URGENT"),
+            notification_webhook_url=_env_str(
+                "TRIAGE_NOTIFICATION_WEBHOOK_URL",
+                cfg.notification_webhook_url,
+            ),
+            notification_email_webhook_url=_env_str(
+                "TRIAGE_EMAIL_WEBHOOK_URL",
+                cfg.notification_email_webhook_url,
+            ),
+            notification_sms_webhook_url=_env_str(
+                "TRIAGE_SMS_WEBHOOK_URL",
+                cfg.notification_sms_webhook_url,
+            ),
+            notification_email_to=_env_csv(
+                "TRIAGE_NOTIFICATION_EMAIL_TO",
+                cfg.notification_email_to,
+            ),
+            notification_sms_to=_env_csv(
+                "TRIAGE_NOTIFICATION_SMS_TO",
+                cfg.notification_sms_to,
+            ),
+            notification_timeout_seconds=_env_float(
+                "TRIAGE_NOTIFICATION_TIMEOUT_SECONDS",
+                cfg.notification_timeout_seconds,
+            ),
+            notification_fail_open=_env_bool(
+                "TRIAGE_NOTIFICATION_FAIL_OPEN",
+                cfg.notification_fail_open,
+            ),
+            auto_book_confidence_threshold=_env_float(
+                "TRIAGE_CONFIDENCE_THRESHOLD", cfg.auto_book_confidence_threshold
+            ),
+            department_score_threshold=_env_float(
+                "TRIAGE_DEPARTMENT_THRESHOLD", cfg.department_score_threshold
+            ),
+            always_route_when_model_requests_human=_env_bool(
+                "TRIAGE_ALWAYS_ROUTE_MODEL_HUMAN",
+                cfg.always_route_when_model_requests_human,
+            ),
+            auto_book_high_urgency=_env_bool(
+                "TRIAGE_AUTO_BOOK_HIGH_URGENCY",
+                cfg.auto_book_high_urgency,
+            ),
+            preemption_enabled=_env_bool(
+                "TRIAGE_PREEMPTION_ENABLED",
+                cfg.preemption_enabled,
+            ),
+            fallback_window_minutes=_env_int(
+                "TRIAGE_FALLBACK_WINDOW_MINUTES",
+                cfg.fallback_window_minutes,
+            ),
+            seed_days=_env_int("TRIAGE_SEED_DAYS", cfg.seed_days),
+            audit_cache_ttl_seconds=_env_float(
+                "TRIAGE_AUDIT_CACHE_TTL_SECONDS",
+                cfg.audit_cache_ttl_seconds,
+            ),
+            audit_cache_max_entries=_env_int(
+                "TRIAGE_AUDIT_CACHE_MAX_ENTRIES",
+                cfg.audit_cache_max_entries,
+            ),
         )
-        cfg.seed_days = _env_int("TRIAGE_SEED_DAYS", cfg.seed_days)
-        return cfg
@@ -2,15 +2,19 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
-from .config import TriageConfig
-from .models import RoutingDecision, TriageResult, urgency_rank
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
 
-DB_TIME_FMT = "%Y-%m-%d %H:%M:%S"
+from .config import TriageConfig
+from .models import URGENCY_RANK, RoutingDecision, TriageResult, urgency_rank
 
 
 def utc_now() -> datetime:
@@ -18,29 +22,120 @@ def utc_now() -> datetime:
 
 
 def to_db_time(value: datetime) -> str:
-    return value.strftime(DB_TIME_FMT)
+    return value.isoformat(" ", "seconds")[:19]
 
 
 def parse_db_time(value: str) -> datetime:
-    return datetime.strptime(value, DB_TIME_FMT)
+    return datetime.fromisoformat(value)
+
+
+def _json_dumps(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _json_loads(raw: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+SQLITE_JOURNAL_MODES = frozenset({"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"})
 
 
 class SQLiteRepository:
-    def __init__(self, db_path: str) -> None:
+    def __init__(self, db_path: str, journal_mode: str = "WAL") -> None:
         self.db_path = str(Path(db_path))
+        journal_mode = journal_mode.upper()
+        self.journal_mode = journal_mode if journal_mode in SQLITE_JOURNAL_MODES else "WAL"
+        self._watch_conn: sqlite3.Connection | None = None
+        self._watch_lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
 
-    def connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path, timeout=30)
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        pooled = getattr(self._local, "conn", None)
+        if pooled is not None and not pooled.in_transaction:
+            with pooled:
+                yield pooled
+            return
+        conn = self._open()
+        if pooled is None:
+            self._local.conn = self._register(conn)
+            with conn:
+                yield conn
+            return
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def read_connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "read_conn", None)
+        if conn is None:
+            conn = self._open()
+            conn.execute("PRAGMA query_only = ON;")
+            self._local.read_conn = self._register(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        with self._watch_lock:
+            if self._watch_conn is not None:
+                connections.append(self._watch_conn)
+                self._watch_conn = None
+        for conn in connections:
+            conn.close()
+
+    def _register(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            check_same_thread=False,
+            uri=self.db_path.startswith("file:"),
+        )
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON;")
+        conn.executescript(
+            """
+            PRAGMA foreign_keys = ON;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -20000;
+            PRAGMA mmap_size = 268435456;
+            """
+        )
         return conn
 
+    def data_version(self) -> int:
+        with self._watch_lock:
+            if self._watch_conn is None:
+                self._watch_conn = sqlite3.connect(
+                    self.db_path,
+                    timeout=30,
+                    check_same_thread=False,
+                    uri=self.db_path.startswith("file:"),
+                )
+            return int(self._watch_conn.execute("PRAGMA data_version;").fetchone()[0])
+
     @contextmanager
-    def _managed_conn(self, conn: sqlite3.Connection | None):
+    def _managed_conn(self, conn: sqlite3.Connection | None, *, write: bool = False):
         if conn is not None:
             yield conn
             return
         with self.connect() as local_conn:
+            if write:
+                local_conn.execute("BEGIN IMMEDIATE;")
             yield local_conn
 
     def init_db(self) -> None:
@@ -131,6 +226,11 @@ class SQLiteRepository:
             FOREIGN KEY(appointment_id) REFERENCES appointments(id)
         );
 
+        CREATE TABLE IF NOT EXISTS urgency_ranks (
+            urgency TEXT PRIMARY KEY,
+            rank INTEGER NOT NULL
+        ) WITHOUT ROWID;
+
         CREATE TABLE IF NOT EXISTS audit_log (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             entity_type TEXT NOT NULL,
@@ -146,46 +246,71 @@ class SQLiteRepository:
             ON nurse_queue(status, priority, created_at);
         CREATE INDEX IF NOT EXISTS idx_appointments_patient
             ON appointments(patient_id, booked_at);
+        CREATE INDEX IF NOT EXISTS idx_appointments_preemption
+            ON appointments(department, status, urgency, slot_id);
+        CREATE INDEX IF NOT EXISTS idx_appointments_preempted
+            ON appointments(preempted_from_appointment_id)
+            WHERE preempted_from_appointment_id IS NOT NULL;
+        CREATE INDEX IF NOT EXISTS idx_appointments_auto_booked
+            ON appointments(id) WHERE note LIKE 'Auto-booked from intake.%';
+        CREATE INDEX IF NOT EXISTS idx_triage_events_created
+            ON triage_events(created_at, urgency, confidence);
+        CREATE INDEX IF NOT EXISTS idx_routing_decisions_triage_event
+            ON routing_decisions(triage_event_id);
+        CREATE INDEX IF NOT EXISTS idx_audit_log_entity_type
+            ON audit_log(entity_type, id);
         """
         with self.connect() as conn:
+            current_mode = conn.execute("PRAGMA journal_mode;").fetchone()[0]
+            if current_mode.upper() != self.journal_mode:
+                current_mode = conn.execute(
+                    f"PRAGMA journal_mode = {self.journal_mode};"
+                ).fetchone()[0]
+            self.journal_mode = current_mode.upper()
             conn.executescript(schema)
+            conn.executemany(
+                "INSERT OR REPLACE INTO urgency_ranks (urgency, rank) VALUES (?, ?);",
+                [(urgency.value, rank) for urgency, rank in URGENCY_RANK.items()],
+            )
+            conn.execute("PRAGMA optimize;")
 
     def seed_slots_if_empty(self, config: TriageConfig) -> None:
         with self.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE;")
             cur = conn.execute("SELECT COUNT(*) FROM slots;")
             slot_count = cur.fetchone()[0]
             if slot_count > 0:
                 return
 
             now = utc_now()
+            department_providers = tuple(
+                (department, providers, len(providers))
+                for department, providers in config.department_providers.items()
+            )
+            rows: list[tuple[str, str, str, str]] = []
             for day in range(config.seed_days):
                 date = (now + timedelta(days=day)).date()
-                for department, providers in config.department_providers.items():
-                    provider_count = len(providers)
-                    for hour in range(9, 17):
-                        start_at = datetime(
-                            year=date.year,
-                            month=date.month,
-                            day=date.day,
-                            hour=hour,
-                            minute=0,
-                            second=0,
-                        )
-                        end_at = start_at + timedelta(minutes=45)
+                day_start = datetime(year=date.year, month=date.month, day=date.day)
+                hours = tuple(
+                    (
+                        hour,
+                        to_db_time(day_start + timedelta(hours=hour)),
+                        to_db_time(day_start + timedelta(hours=hour, minutes=45)),
+                    )
+                    for hour in range(9, 17)
+                )
+                for department, providers, provider_count in department_providers:
+                    for hour, start_at, end_at in hours:
                         provider = providers[(hour + day) % provider_count]
-                        conn.execute(
-                            """
-                            INSERT INTO slots (
-                                department, provider, start_at, end_at, status
-                            ) VALUES (?, ?, ?, ?, 'AVAILABLE');
-                            """,
-                            (
-                                department,
-                                provider,
-                                to_db_time(start_at),
-                                to_db_time(end_at),
-                            ),
-                        )
+                        rows.append((department, provider, start_at, end_at))
+            conn.executemany(
+                """
+                INSERT INTO slots (
+                    department, provider, start_at, end_at, status
+                ) VALUES (?, ?, ?, ?, 'AVAILABLE');
+                """,
+                rows,
+            )
 
     def create_patient(
         self,
@@ -196,7 +321,7 @@ class SQLiteRepository:
         symptoms: str,
         conn: sqlite3.Connection | None = None,
     ) -> int:
-        with self._managed_conn(conn) as db:
+        with self._managed_conn(conn, write=True) as db:
             cur = db.execute(
                 """
                 INSERT INTO patients (phone, age, sex, symptoms)
@@ -213,7 +338,7 @@ class SQLiteRepository:
         triage_result: TriageResult,
         conn: sqlite3.Connection | None = None,
     ) -> int:
-        with self._managed_conn(conn) as db:
+        with self._managed_conn(conn, write=True) as db:
             cur = db.execute(
                 """
                 INSERT INTO triage_events (
@@ -235,8 +360,8 @@ class SQLiteRepository:
                     triage_result.redacted_symptoms,
                     triage_result.urgency.value,
                     triage_result.confidence,
-                    json.dumps(triage_result.red_flags),
-                    json.dumps(
+                    _json_dumps(triage_result.red_flags),
+                    _json_dumps(
                         [
                             {"department": d.department, "score": d.score}
                             for d in triage_result.department_candidates
@@ -257,7 +382,7 @@ class SQLiteRepository:
         decision: RoutingDecision,
         conn: sqlite3.Connection | None = None,
     ) -> int:
-        with self._managed_conn(conn) as db:
+        with self._managed_conn(conn, write=True) as db:
             cur = db.execute(
                 """
                 INSERT INTO routing_decisions (
@@ -287,7 +412,7 @@ class SQLiteRepository:
         priority: str,
         conn: sqlite3.Connection | None = None,
     ) -> int:
-        with self._managed_conn(conn) as db:
+        with self._managed_conn(conn, write=True) as db:
             cur = db.execute(
                 """
                 INSERT INTO nurse_queue (triage_event_id, reason, priority)
@@ -314,7 +439,7 @@ class SQLiteRepository:
         assigned_to: str | None = None,
         conn: sqlite3.Connection | None = None,
     ) -> None:
-        with self._managed_conn(conn) as db:
+        with self._managed_conn(conn, write=True) as db:
             db.execute(
                 """
                 UPDATE nurse_queue
@@ -332,7 +457,7 @@ class SQLiteRepository:
             )
 
     def get_queue_item(self, queue_id: int) -> dict[str, Any] | None:
-        with self.connect() as conn:
+        with self.read_connect() as conn:
             row = conn.execute(
                 """
                 SELECT
@@ -349,7 +474,7 @@ class SQLiteRepository:
             return dict(row) if row else None
 
     def list_queue(self, *, status: str = "PENDING", limit: int = 200) -> list[dict[str, Any]]:
-        with self.connect() as conn:
+        with self.read_connect() as conn:
             rows = conn.execute(
                 """
                 SELECT
@@ -397,7 +522,7 @@ class SQLiteRepository:
         appointment_id: int | None = None,
         conn: sqlite3.Connection | None = None,
     ) -> int:
-        with self._managed_conn(conn) as db:
+        with self._managed_conn(conn, write=True) as db:
             cur = db.execute(
                 """
                 INSERT INTO slots (
@@ -480,7 +605,7 @@ class SQLiteRepository:
         conn: sqlite3.Connection | None = None,
     ) -> dict[str, Any] | None:
         with self._managed_conn(conn) as db:
-            rows = db.execute(
+            row = db.execute(
                 """
                 SELECT
                     a.id AS appointment_id,
@@ -491,30 +616,18 @@ class SQLiteRepository:
                     s.end_at,
                     s.provider
                 FROM appointments a
+                JOIN urgency_ranks u ON u.urgency = a.urgency
                 JOIN slots s ON s.id = a.slot_id
                 WHERE a.status = 'BOOKED'
                   AND a.department = ?
+                  AND u.rank < ?
                   AND s.start_at <= ?
-                ORDER BY s.start_at ASC;
+                ORDER BY u.rank ASC, s.start_at ASC
+                LIMIT 1;
                 """,
-                (department, to_db_time(window_end)),
-            ).fetchall()
-            if not rows:
-                return None
-
-            higher_rank = urgency_rank(higher_urgency)
-            candidates = []
-            for row in rows:
-                row_rank = urgency_rank(row["urgency"])
-                if row_rank < higher_rank:
-                    candidates.append(dict(row))
-            if not candidates:
-                return None
-
-            candidates.sort(
-                key=lambda item: (urgency_rank(item["urgency"]), item["start_at"])
-            )
-            return candidates[0]
+                (department, urgency_rank(higher_urgency), to_db_time(window_end)),
+            ).fetchone()
+            return dict(row) if row else None
 
     def create_appointment(
         self,
@@ -529,19 +642,8 @@ class SQLiteRepository:
         preempted_from_appointment_id: int | None = None,
         conn: sqlite3.Connection | None = None,
     ) -> int:
-        with self._managed_conn(conn) as db:
-            updated = db.execute(
-                """
-                UPDATE slots
-                SET status = 'BOOKED'
-                WHERE id = ? AND status = 'AVAILABLE';
-                """,
-                (slot_id,),
-            )
-            if updated.rowcount != 1:
-                raise RuntimeError("Slot is no longer available.")
-
-            cur = db.execute(
+        with self._managed_conn(conn, write=True) as db:
+            row = db.execute(
                 """
                 INSERT INTO appointments (
                     patient_id,
@@ -554,7 +656,10 @@ class SQLiteRepository:
                     note,
                     preempted_from_appointment_id
                 )
-                VALUES (?, ?, ?, ?, ?, ?, 'BOOKED', ?, ?);
+                SELECT ?, ?, ?, ?, ?, id, 'BOOKED', ?, ?
+                FROM slots
+                WHERE id = ? AND status = 'AVAILABLE'
+                RETURNING id;
                 """,
                 (
                     patient_id,
@@ -562,14 +667,17 @@ class SQLiteRepository:
                     urgency,
                     department,
                     provider,
-                    slot_id,
                     note,
                     preempted_from_appointment_id,
+                    slot_id,
                 ),
-            )
-            appointment_id = int(cur.lastrowid)
+            ).fetchone()
+            if row is None:
+                raise RuntimeError("Slot is no longer available.")
+
+            appointment_id = int(row[0])
             db.execute(
-                "UPDATE slots SET appointment_id = ? WHERE id = ?;",
+                "UPDATE slots SET status = 'BOOKED', appointment_id = ? WHERE id = ?;",
                 (appointment_id, slot_id),
             )
             self.log_appointment_activity(
@@ -600,7 +708,7 @@ class SQLiteRepository:
         note: str,
         conn: sqlite3.Connection | None = None,
     ) -> None:
-        with self._managed_conn(conn) as db:
+        with self._managed_conn(conn, write=True) as db:
             appt = db.execute(
                 """
                 SELECT slot_id, provider, note
@@ -687,13 +795,13 @@ class SQLiteRepository:
         details: dict[str, Any],
         conn: sqlite3.Connection | None = None,
     ) -> None:
-        with self._managed_conn(conn) as db:
+        with self._managed_conn(conn, write=True) as db:
             db.execute(
                 """
                 INSERT INTO appointment_activity (appointment_id, activity_type, details)
                 VALUES (?, ?, ?);
                 """,
-                (appointment_id, activity_type, json.dumps(details)),
+                (appointment_id, activity_type, _json_dumps(details)),
             )
 
     def audit(
@@ -705,17 +813,17 @@ class SQLiteRepository:
         payload: dict[str, Any],
         conn: sqlite3.Connection | None = None,
     ) -> None:
-        with self._managed_conn(conn) as db:
+        with self._managed_conn(conn, write=True) as db:
             db.execute(
                 """
                 INSERT INTO audit_log (entity_type, entity_id, action, payload)
                 VALUES (?, ?, ?, ?);
                 """,
-                (entity_type, entity_id, action, json.dumps(payload)),
+                (entity_type, entity_id, action, _json_dumps(payload)),
             )
 
     def get_patient(self, patient_id: int) -> dict[str, Any] | None:
-        with self.connect() as conn:
+        with self.read_connect() as conn:
             row = conn.execute(
                 "SELECT * FROM patients WHERE id = ?;",
                 (patient_id,),
@@ -723,7 +831,7 @@ class SQLiteRepository:
             return dict(row) if row else None
 
     def get_triage_event(self, triage_event_id: int) -> dict[str, Any] | None:
-        with self.connect() as conn:
+        with self.read_connect() as conn:
             row = conn.execute(
                 "SELECT * FROM triage_events WHERE id = ?;",
                 (triage_event_id,),
@@ -731,8 +839,8 @@ class SQLiteRepository:
             if not row:
                 return None
             event = dict(row)
-            event["red_flags"] = json.loads(event["red_flags"])
-            event["department_candidates"] = json.loads(event["department_candidates"])
+            event["red_flags"] = _json_loads(event["red_flags"])
+            event["department_candidates"] = _json_loads(event["department_candidates"])
             return event
 
     def get_appointment(
@@ -754,82 +862,82 @@ class SQLiteRepository:
             return dict(row) if row else None
 
     def list_departments(self) -> list[str]:
-        with self.connect() as conn:
+        with self.read_connect() as conn:
             rows = conn.execute(
                 "SELECT DISTINCT department FROM slots ORDER BY department ASC;"
             ).fetchall()
             return [row["department"] for row in rows]
 
     def dashboard_metrics(self) -> dict[str, int | float]:
-        with self.connect() as conn:
-            total_slots = conn.execute("SELECT COUNT(*) FROM slots;").fetchone()[0]
-            available_slots = conn.execute(
-                "SELECT COUNT(*) FROM slots WHERE status = 'AVAILABLE';"
-            ).fetchone()[0]
+        with self.read_connect() as conn:
+            row = conn.execute(
+                """
+                WITH slot_counts AS (
+                    SELECT
+                        COUNT(*) AS total,
+                        COALESCE(SUM(status = 'AVAILABLE'), 0) AS available
+                    FROM slots
+                ),
+                queue_counts AS (
+                    SELECT
+                        COUNT(*) AS pending,
+                        COALESCE(SUM(priority IN ('EMERGENCY', 'URGENT')), 0) AS high_priority
+                    FROM nurse_queue
+                    WHERE status = 'PENDING'
+                ),
+                triage_counts AS (
+                    SELECT
+                        COUNT(*) AS total,
+                        COALESCE(SUM(urgency IN ('EMERGENCY', 'URGENT')), 0) AS urgent,
+                        AVG(confidence) AS avg_confidence
+                    FROM triage_events
+                    WHERE created_at >= datetime('now', '-24 hours')
+                )
+                SELECT
+                    s.total AS total_slots,
+                    s.available AS available_slots,
+                    (
+                        SELECT COUNT(*) FROM (
+                            SELECT patient_id
+                            FROM appointments
+                            GROUP BY patient_id
+                            HAVING COUNT(*) > 1
+                        )
+                    ) AS repeat_patients,
+                    q.pending AS pending_queue,
+                    q.high_priority AS pending_high_priority_queue,
+                    (SELECT COUNT(*) FROM appointments) AS total_appointments,
+                    (
+                        SELECT COUNT(*)
+                        FROM appointments
+                        WHERE note LIKE 'Auto-booked from intake.%'
+                    ) AS auto_booked_appointments,
+                    (
+                        SELECT COUNT(*)
+                        FROM appointments
+                        WHERE preempted_from_appointment_id IS NOT NULL
+                    ) AS preempted_appointments,
+                    t.total AS triage_events_24h,
+                    t.urgent AS urgent_cases_24h,
+                    t.avg_confidence AS avg_confidence_24h
+                FROM slot_counts s, queue_counts q, triage_counts t;
+                """
+            ).fetchone()
+            total_slots = row["total_slots"]
+            available_slots = row["available_slots"]
             booked_slots = int(total_slots) - int(available_slots)
             slot_utilization_percent = (
                 round((booked_slots / int(total_slots)) * 100, 1) if int(total_slots) > 0 else 0.0
             )
-            repeat_patients = conn.execute(
-                """
-                SELECT COUNT(*) FROM (
-                    SELECT patient_id
-                    FROM appointments
-                    GROUP BY patient_id
-                    HAVING COUNT(*) > 1
-                ) t;
-                """
-            ).fetchone()[0]
-            pending_queue = conn.execute(
-                "SELECT COUNT(*) FROM nurse_queue WHERE status = 'PENDING';"
-            ).fetchone()[0]
-            pending_high_priority_queue = conn.execute(
-                """
-                SELECT COUNT(*)
-                FROM nurse_queue
-                WHERE status = 'PENDING'
-                  AND priority IN ('EMERGENCY', 'URGENT');
-                """
-            ).fetchone()[0]
-            total_appointments = conn.execute(
-                "SELECT COUNT(*) FROM appointments;"
-            ).fetchone()[0]
-            auto_booked_appointments = conn.execute(
-                """
-                SELECT COUNT(*)
-                FROM appointments
-                WHERE note LIKE 'Auto-booked from intake.%';
-                """
-            ).fetchone()[0]
-            preempted_appointments = conn.execute(
-                """
-                SELECT COUNT(*)
-                FROM appointments
-                WHERE preempted_from_appointment_id IS NOT NULL;
-                """
-            ).fetchone()[0]
-            triage_events_24h = conn.execute(
-                """
-                SELECT COUNT(*)
-                FROM triage_events
-                WHERE created_at >= datetime('now', '-24 hours');
-                """
-            ).fetchone()[0]
-            urgent_cases_24h = conn.execute(
-                """
-                SELECT COUNT(*)
-                FROM triage_events
-                WHERE created_at >= datetime('now', '-24 hours')
-                  AND urgency IN ('EMERGENCY', 'URGENT');
-                """
-            ).fetchone()[0]
-            avg_confidence_24h_raw = conn.execute(
-                """
-                SELECT AVG(confidence)
-                FROM triage_events
-                WHERE created_at >= datetime('now', '-24 hours');
-                """
-            ).fetchone()[0]
+            repeat_patients = row["repeat_patients"]
+            pending_queue = row["pending_queue"]
+            pending_high_priority_queue = row["pending_high_priority_queue"]
+            total_appointments = row["total_appointments"]
+            auto_booked_appointments = row["auto_booked_appointments"]
+            preempted_appointments = row["preempted_appointments"]
+            triage_events_24h = row["triage_events_24h"]
+            urgent_cases_24h = row["urgent_cases_24h"]
+            avg_confidence_24h_raw = row["avg_confidence_24h"]
             avg_confidence_24h = round(float(avg_confidence_24h_raw or 0.0), 3)
             return {
                 "repeat_patients_in_slots": int(repeat_patients),
@@ -848,7 +956,7 @@ class SQLiteRepository:
             }
 
     def recent_appointments(self, limit: int = 30) -> list[dict[str, Any]]:
-        with self.connect() as conn:
+        with self.read_connect() as conn:
             rows = conn.execute(
                 """
                 SELECT
@@ -874,7 +982,7 @@ class SQLiteRepository:
             return [dict(row) for row in rows]
 
     def recent_activity(self, limit: int = 30) -> list[dict[str, Any]]:
-        with self.connect() as conn:
+        with self.read_connect() as conn:
             rows = conn.execute(
                 """
                 SELECT id, appointment_id, activity_type, details, created_at
@@ -887,14 +995,30 @@ class SQLiteRepository:
             output = []
             for row in rows:
                 item = dict(row)
-                item["details"] = json.loads(item["details"])
+                item["details"] = _json_loads(item["details"])
                 output.append(item)
             return output
 
-    def recent_triage_decisions(self, limit: int = 100) -> list[dict[str, Any]]:
-        with self.connect() as conn:
-            rows = conn.execute(
-                """
+    def recent_triage_decisions(
+        self,
+        limit: int = 100,
+        *,
+        include_patient: bool = True,
+        conn: sqlite3.Connection | None = None,
+    ) -> list[dict[str, Any]]:
+        patient_columns = (
+            """,
+                    p.id AS patient_id,
+                    p.phone,
+                    p.age,
+                    p.sex,
+                    p.symptoms"""
+            if include_patient
+            else ""
+        )
+        with self._managed_conn(conn) as db:
+            rows = db.execute(
+                f"""
                 SELECT
                     t.id AS triage_event_id,
                     t.created_at,
@@ -903,12 +1027,7 @@ class SQLiteRepository:
                     t.suggested_department,
                     t.human_routing_flag,
                     r.action AS routing_action,
-                    r.reason AS routing_reason,
-                    p.id AS patient_id,
-                    p.phone,
-                    p.age,
-                    p.sex,
-                    p.symptoms
+                    r.reason AS routing_reason{patient_columns}
                 FROM triage_events t
                 LEFT JOIN routing_decisions r ON r.triage_event_id = t.id
                 JOIN patients p ON p.id = t.patient_id
@@ -924,12 +1043,19 @@ class SQLiteRepository:
         *,
         limit: int = 100,
         entity_type: str | None = None,
+        include_payload: bool = True,
+        conn: sqlite3.Connection | None = None,
     ) -> list[dict[str, Any]]:
-        with self.connect() as conn:
+        columns = (
+            "id, entity_type, entity_id, action, payload, created_at"
+            if include_payload
+            else "id, entity_type, entity_id, action, created_at"
+        )
+        with self._managed_conn(conn) as db:
             if entity_type:
-                rows = conn.execute(
-                    """
-                    SELECT id, entity_type, entity_id, action, payload, created_at
+                rows = db.execute(
+                    f"""
+                    SELECT {columns}
                     FROM audit_log
                     WHERE entity_type = ?
                     ORDER BY id DESC
@@ -938,20 +1064,22 @@ class SQLiteRepository:
                     (entity_type, limit),
                 ).fetchall()
             else:
-                rows = conn.execute(
-                    """
-                    SELECT id, entity_type, entity_id, action, payload, created_at
+                rows = db.execute(
+                    f"""
+                    SELECT {columns}
                     FROM audit_log
                     ORDER BY id DESC
                     LIMIT ?;
                     """,
                     (limit,),
                 ).fetchall()
+            if not include_payload:
+                return [dict(row) for row in rows]
             parsed: list[dict[str, Any]] = []
             for row in rows:
                 item = dict(row)
                 try:
-                    item["payload"] = json.loads(item["payload"])
+                    item["payload"] = _json_loads(item["payload"])
                 except json.JSONDecodeError:
                     pass
                 parsed.append(item)
@@ -19,6 +19,8 @@ from .pii import redact_pii
 
 logger = logging.getLogger(__name__)
 
+_FENCE_RE = re.compile(r"^```[a-zA-Z0-9_-]*\s*(.*)\s*```$", re.DOTALL)
+
 try:
     from google import genai
     from google.genai import types as genai_types
@@ -147,7 +149,7 @@ class GeminiTriageReasoner:
 
     def _parse_payload(self, raw_output: str) -> LLMTriagePayload:
         cleaned = raw_output.strip()
-        fence_match = re.match(r"^```[a-zA-Z0-9_-]*\s*(.*)\s*```$", cleaned, re.DOTALL)
+        fence_match = _FENCE_RE.match(cleaned)
         if fence_match:
             cleaned = fence_match.group(1).strip()
 
@@ -24,13 +24,16 @@ class NotificationEvent:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NotificationDelivery:
     channel: str
     status: str
     detail: str
 
 
+_NOOP_DELIVERY = NotificationDelivery(channel="noop", status="SKIPPED", detail="Disabled.")
+
+
 class NotificationDispatcherProtocol(Protocol):
     label: str
 
@@ -49,7 +52,7 @@ class NoopNotificationDispatcher:
             event.urgency,
             event.triage_event_id,
         )
-        return [NotificationDelivery(channel="noop", status="SKIPPED", detail="Disabled.")]
+        return [_NOOP_DELIVERY]
 
 
 @dataclass
@@ -24,7 +24,7 @@ class Scheduler:
         allow_preemption: bool = True,
     ) -> AppointmentResult:
         now = utc_now()
-        window_minutes = self.config.urgency_windows_minutes[urgency.value]
+        window_minutes = self.config.window_for(urgency)
         window_end = now + timedelta(minutes=window_minutes)
         fallback_end = now + timedelta(minutes=self.config.fallback_window_minutes)
 
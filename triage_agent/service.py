@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Any
 
 from .config import TriageConfig
@@ -27,6 +30,12 @@ class TriageService:
     reasoner_label: str = "unknown"
     notifier: NotificationDispatcherProtocol | None = None
     notifier_label: str = "none"
+    _audit_cache: OrderedDict[tuple[str, int], tuple[int, float, dict[str, Any]]] = field(
+        default_factory=OrderedDict,
+        init=False,
+        repr=False,
+    )
+    _audit_cache_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     def process_intake(
         self,
@@ -204,19 +213,44 @@ class TriageService:
 
     def get_audit_view(self, *, role: str, limit: int = 100) -> dict[str, list[dict[str, Any]]]:
         normalized_role = role.strip().lower()
-        triage_rows = self.repository.recent_triage_decisions(limit=limit)
-        audit_rows = self.repository.recent_audit_log(limit=limit)
-        if normalized_role == "admin":
-            return {"triage": triage_rows, "audit_log": audit_rows}
+        ttl = self.config.audit_cache_ttl_seconds
+        if ttl <= 0:
+            return self._load_audit_view(normalized_role, limit)
+        key = (normalized_role, limit)
+        version = self.repository.data_version()
+        now = time.monotonic()
+        with self._audit_cache_lock:
+            cached = self._audit_cache.get(key)
+            if cached is not None and cached[0] == version and cached[1] > now:
+                self._audit_cache.move_to_end(key)
+                return cached[2]
+        view = self._load_audit_view(normalized_role, limit)
+        with self._audit_cache_lock:
+            self._audit_cache[key] = (version, now + ttl, view)
+            self._audit_cache.move_to_end(key)
+            while len(self._audit_cache) > max(1, self.config.audit_cache_max_entries):
+                self._audit_cache.popitem(last=False)
+        return view
+
+    def _load_audit_view(self, normalized_role: str, limit: int) -> dict[str, list[dict[str, Any]]]:
+        privileged = normalized_role in {"admin", "nurse"}
+        with self.repository.read_connect() as conn:
+            triage_rows = self.repository.recent_triage_decisions(
+                limit=limit,
+                include_patient=privileged,
+                conn=conn,
+            )
+            audit_rows = self.repository.recent_audit_log(
+                limit=limit,
+                include_payload=privileged,
+                conn=conn,
+            )
         if normalized_role == "nurse":
             return {
                 "triage": [self._nurse_view_row(row) for row in triage_rows],
-                "audit_log": [self._audit_view_row(row, include_payload=True) for row in audit_rows],
+                "audit_log": audit_rows,
             }
-        return {
-            "triage": [self._operations_view_row(row) for row in triage_rows],
-            "audit_log": [self._audit_view_row(row, include_payload=False) for row in audit_rows],
-        }
+        return {"triage": triage_rows, "audit_log": audit_rows}
 
     @staticmethod
     def parse_urgency(raw: str) -> Urgency:
@@ -306,27 +340,3 @@ class TriageService:
         scoped = dict(row)
         scoped["phone"] = "-"
         return scoped
-
-    def _operations_view_row(self, row: dict[str, Any]) -> dict[str, Any]:
-        return {
-            "triage_event_id": row.get("triage_event_id"),
-            "created_at": row.get("created_at"),
-            "urgency": row.get("urgency"),
-            "confidence": row.get("confidence"),
-            "suggested_department": row.get("suggested_department"),
-            "human_routing_flag": row.get("human_routing_flag"),
-            "routing_action": row.get("routing_action"),
-            "routing_reason": row.get("routing_reason"),
-        }
-
-    def _audit_view_row(self, row: dict[str, Any], *, include_payload: bool) -> dict[str, Any]:
-        base = {
-            "id": row.get("id"),
-            "entity_type": row.get("entity_type"),
-            "entity_id": row.get("entity_id"),
-            "action": row.get("action"),
-            "created_at": row.get("created_at"),
-        }
-        if include_payload:
-            base["payload"] = row.get("payload")
-        return base